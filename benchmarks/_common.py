@@ -0,0 +1,55 @@
+"""
+Shared helpers for the benchmark scripts. Run benchmarks from the repository root, e.g.
+    python benchmarks/bench_compress.py
+"""
+
+import collections
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # the templates are loaded relative to the working directory
+
+from table import Table  # noqa: E402
+from tablerow import TableColumn  # noqa: E402
+
+HEADERS = ["id", "name", "status", "score", "color", "note"]
+NAMES = ["Alice", "Bob", "Charlie", "Dana", "Eve", "Frank", "Grace"]
+STATUSES = ["active", "inactive", "pending"]
+
+
+def make_rows(count: int, seed: int = 0) -> list[list[str]]:
+    rng = random.Random(seed)
+    return [
+        [
+            str(i),
+            rng.choice(NAMES),
+            rng.choice(STATUSES),
+            str(rng.randint(0, 10000)),
+            "#{:06x}".format(rng.getrandbits(24)),
+            "Bob, Charlie" if i % 10 == 0 else "plain note {}".format(i % 97),
+        ]
+        for i in range(count)
+    ]
+
+
+def make_table(count: int, seed: int = 0) -> Table:
+    table = Table(collections.OrderedDict((h, TableColumn.named(h)) for h in HEADERS))
+    for row in make_rows(count, seed):
+        table.add_row_ordered(*row)
+    return table
+
+
+def timed(fn, repeat: int = 3) -> float:
+    """
+    Best wall clock time of repeat calls to fn in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,37 @@
+"""
+Rendering with the columns bound to their specializers by sampling compared with trying
+every specializer on every cell
+"""
+
+import os
+
+import _common
+from htmltable import TableHTMLMaker
+
+ROWS = 50_000
+
+
+def main():
+    table = _common.make_table(ROWS)
+    for row in table.rows:
+        row.content[4] = "@color:" + row.content[4]
+
+    def render(maker: TableHTMLMaker) -> str:
+        return "".join(maker.iter_html())
+
+    maker = TableHTMLMaker(table, seed=0)
+    with open(os.devnull, "w") as f:
+        before = _common.timed(lambda: maker.write(f))
+        expected = render(maker)
+        maker.detect_bindings()
+        after = _common.timed(lambda: maker.write(f))
+        assert render(maker) == expected
+
+    print(f"{ROWS} rows")
+    print(
+        f"unbound {before:.3f}s bound {after:.3f}s ({before / after:.2f}x), {ROWS / after:.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
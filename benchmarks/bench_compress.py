@@ -0,0 +1,63 @@
+"""
+Throughput and output size of streaming compressed output at a few compression levels
+"""
+
+import io
+
+import _common
+from compressors import get_compressor
+from htmltable import TableHTMLMaker
+
+ROWS = 20_000
+CASES = [
+    ("none", None),
+    ("gzip", 1),
+    ("gzip", 6),
+    ("gzip", 9),
+    ("bz2", 9),
+    ("xz", 0),
+    ("xz", 6),
+    ("zstd", 3),
+    ("zstd", 19),
+]
+
+
+def render(maker: TableHTMLMaker, name: str, level: int | None) -> int:
+    compressor = get_compressor(name, level)
+    raw = io.BytesIO()
+    stream = compressor.open(raw)
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    maker.write(text)
+    text.flush()
+    text.detach()
+    compressor.finish(stream)
+    return raw.tell()
+
+
+def main():
+    maker = TableHTMLMaker(_common.make_table(ROWS))
+    plain = render(maker, "none", None)
+
+    print(f"{ROWS} rows, {plain / 1e6:.2f} MB uncompressed")
+    print(
+        f"{'codec':>6} {'level':>5} {'seconds':>8} {'rows/s':>10} {'bytes':>10} {'ratio':>7}"
+    )
+    for name, level in CASES:
+        size = 0
+
+        def run():
+            nonlocal size
+            size = render(maker, name, level)
+
+        try:
+            seconds = _common.timed(run, repeat=1)
+        except RuntimeError as e:
+            print(f"{name:>6} {level!s:>5} skipped: {e}")
+            continue
+        print(
+            f"{name:>6} {level!s:>5} {seconds:8.3f} {ROWS / seconds:10.0f} {size:10d} {plain / size:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
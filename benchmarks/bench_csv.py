@@ -0,0 +1,64 @@
+"""
+CSV export and round trip through Table.from_csv_reader for large tables.
+Pass the row count as the first argument, e.g. python benchmarks/bench_csv.py 1000000
+"""
+
+import csv
+import io
+import sys
+
+import _common
+from table import Table
+from tablerow import quote_wrap
+
+
+def legacy_str(table: Table) -> str:
+    # Table.__str__ before write_pretty, kept here for comparison
+    longest_len = 0
+    for row in table.rows:
+        for entry in row:
+            if len(entry) > longest_len:
+                longest_len = len(entry)
+
+    if longest_len > 40:
+        longest_len = 0
+
+    content = [",".join(quote_wrap(i).rjust(longest_len) for i in table.headers)]
+    for row in table.rows:
+        row_str = ""
+        for entry in row:
+            row_str = ",".join(quote_wrap(i).rjust(longest_len) for i in row)
+        content.append(row_str)
+
+    return "\n".join(content)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    table = _common.make_table(rows)
+
+    buffer = io.StringIO(newline="")
+    table.write_csv(buffer)
+    text = buffer.getvalue()
+
+    def read():
+        Table.from_csv_reader(csv.reader(io.StringIO(text, newline="")))
+
+    result = Table.from_csv_reader(csv.reader(io.StringIO(text, newline="")))
+    assert [r.content for r in result.rows] == [r.content for r in table.rows]
+
+    cases = [
+        ("legacy __str__", lambda: legacy_str(table)),
+        ("write_pretty", lambda: table.write_pretty(io.StringIO())),
+        ("write_csv", lambda: table.write_csv(io.StringIO(newline=""))),
+        ("from_csv_reader", read),
+    ]
+
+    print(f"{rows} rows, {len(text) / 1e6:.1f} MB of CSV")
+    for name, fn in cases:
+        seconds = _common.timed(fn, repeat=1)
+        print(f"{name:>16} {seconds:8.3f}s {rows / seconds:12.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+escape_text compared with calling html.escape on every cell, for clean and dirty text
+"""
+
+import html
+import os
+import timeit
+
+import _common
+from htmltable import TableHTMLMaker
+from tag import escape_text
+
+ROWS = 20_000
+
+
+def main():
+    rows = _common.make_rows(ROWS)
+    clean = [cell.replace(",", "") for row in rows for cell in row]
+    dirty = [cell + " & <b>" for cell in clean]
+
+    print(f"{len(clean)} cells")
+    for name, cells in (("clean", clean), ("dirty", dirty)):
+        assert [escape_text(i) for i in cells] == [html.escape(i) for i in cells]
+        before = min(timeit.repeat(lambda: [html.escape(i) for i in cells], number=5))
+        after = min(timeit.repeat(lambda: [escape_text(i) for i in cells], number=5))
+        print(
+            f"{name:>6} html.escape {before:.3f}s escape_text {after:.3f}s ({before / after:.2f}x)"
+        )
+
+    maker = TableHTMLMaker(_common.make_table(ROWS))
+    with open(os.devnull, "w") as f:
+        seconds = _common.timed(lambda: maker.write(f))
+    print(f"full render {seconds:.3f}s, {ROWS / seconds:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Size of the rendered page with and without --minify, before and after gzip
+"""
+
+import collections
+import gzip
+
+import _common
+from htmltable import TableHTMLMaker
+from htmltemplate import HTMLTemplate
+from table import Table
+from tablerow import TableColumn
+
+ROWS = 10_000
+
+
+def make_table(special: bool) -> Table:
+    table = Table(
+        collections.OrderedDict((h, TableColumn.named(h)) for h in _common.HEADERS)
+    )
+    for row in _common.make_rows(ROWS):
+        if special:
+            row[4] = "@color:" + row[4]
+        table.add_row_ordered(*row)
+    return table
+
+
+def page(table: Table, minify: bool) -> str:
+    template = HTMLTemplate.from_files(minify=minify)
+    maker = TableHTMLMaker(table, minify=minify)
+    return "".join(template.iter_document(maker.iter_html()))
+
+
+def main():
+    print(f"{ROWS} rows")
+    print(f"{'table':>14} {'mode':>8} {'bytes':>10} {'gzip bytes':>11} {'seconds':>8}")
+    for name, special in (("plain text", False), ("@color cells", True)):
+        table = make_table(special)
+        sizes = {}
+        for minify in (False, True):
+            html = ""
+
+            def run():
+                nonlocal html
+                html = page(table, minify)
+
+            seconds = _common.timed(run, repeat=1)
+            raw = len(html.encode("utf-8"))
+            compressed = len(gzip.compress(html.encode("utf-8"), 6))
+            sizes[minify] = (raw, compressed)
+            mode = "minify" if minify else "normal"
+            print(f"{name:>14} {mode:>8} {raw:10d} {compressed:11d} {seconds:8.3f}")
+        (raw, compressed), (min_raw, min_compressed) = sizes[False], sizes[True]
+        print(
+            f"{name:>14} {'saved':>8} {1 - min_raw / raw:9.1%} {1 - min_compressed / compressed:10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
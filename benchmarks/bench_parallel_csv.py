@@ -0,0 +1,39 @@
+"""
+Parsing a large CSV file with 1 to N worker processes compared with a single csv.reader.
+The parent process still has to rebuild every row it receives, so the speedup levels off
+well before the number of cores.
+Pass the row count as the first argument, e.g. python benchmarks/bench_parallel_csv.py 2000000
+"""
+
+import os
+import sys
+import tempfile
+
+import _common
+import parallelcsv
+from table import Table
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} - {0})
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "input.csv")
+        _common.make_table(rows).save_filename(filename)
+        size = os.path.getsize(filename)
+
+        baseline = _common.timed(lambda: Table.from_filename(filename), 1)
+        print(f"{rows} rows, {size / 1e6:.1f} MB, {cores} cores")
+        print(f"{'csv.reader':>12} {baseline:8.3f}s")
+        for workers in counts:
+            seconds = _common.timed(
+                lambda: Table.from_csv_reader(parallelcsv.read_rows(filename, workers)),
+                1,
+            )
+            print(f"{workers:>4} workers {seconds:8.3f}s ({baseline / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
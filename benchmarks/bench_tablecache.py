@@ -0,0 +1,38 @@
+"""
+Loading a table from its binary cache compared with parsing the CSV.
+Pass the row count as the first argument, e.g. python benchmarks/bench_tablecache.py 1000000
+"""
+
+import os
+import sys
+import tempfile
+
+import _common
+import tablecache
+from table import Table
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "input.csv")
+        _common.make_table(rows).save_filename(filename)
+
+        parse = _common.timed(lambda: Table.from_filename(filename))
+        miss = _common.timed(lambda: Table.from_filename(filename, cache=True), 1)
+        hit = _common.timed(lambda: Table.from_filename(filename, cache=True))
+        fingerprint = _common.timed(lambda: tablecache.fingerprint(filename))
+
+        size = os.path.getsize(filename)
+        cache_size = os.path.getsize(tablecache.cache_filename(filename))
+
+    print(f"{rows} rows, {size / 1e6:.1f} MB CSV, {cache_size / 1e6:.1f} MB cache")
+    print(f"{'csv parse':>12} {parse:8.3f}s")
+    print(f"{'cache miss':>12} {miss:8.3f}s")
+    print(f"{'cache hit':>12} {hit:8.3f}s  ({parse / hit:.1f}x faster than parsing)")
+    print(f"{'fingerprint':>12} {fingerprint:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Rendering on a thread pool compared with rendering on one thread. Rendering is pure Python,
+so threads only help on a free threaded build (python3.13t and later)
+"""
+
+import os
+import sys
+import sysconfig
+
+import _common
+from htmltable import TableHTMLMaker
+
+ROWS = 50_000
+
+
+def main():
+    table = _common.make_table(ROWS)
+    for row in table.rows:
+        row.content[4] = "@color:" + row.content[4]
+    maker = TableHTMLMaker(table, seed=0)
+
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    gil = "enabled" if getattr(sys, "_is_gil_enabled", lambda: True)() else "disabled"
+    print(f"{ROWS} rows, free threaded build: {free_threaded}, GIL {gil}")
+
+    expected = "".join(maker.iter_html())
+    with open(os.devnull, "w") as f:
+        base = _common.timed(lambda: maker.write(f))
+        print(f"threads  1 {base:.3f}s")
+        for threads in (2, 4, 8):
+            assert "".join(maker.iter_html(threads=threads)) == expected
+            seconds = _common.timed(lambda: maker.write(f, threads=threads))
+            print(f"threads {threads:>2} {seconds:.3f}s ({base / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import abc
+import bz2
+import gzip
+import lzma
+import typing
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Compressor(abc.ABC):
+    """
+    Wraps a binary output file in a stream that compresses everything written to it.
+    Data is compressed incrementally as it is written so the uncompressed output never
+    has to exist in memory or on disk. Register new codecs with register_compressor()
+    """
+
+    name: typing.ClassVar[str]
+    extension: typing.ClassVar[str]
+
+    def __init__(self, level: int | None = None):
+        self.level = level
+
+    @abc.abstractmethod
+    def open(self, f: typing.BinaryIO) -> typing.BinaryIO:
+        """
+        Return a writable binary stream that writes compressed data to f
+        """
+
+    def finish(self, stream: typing.BinaryIO):
+        """
+        Flush the end of the compressed data to the underlying file. The underlying file is left open
+        """
+        stream.close()
+
+
+class IdentityCompressor(Compressor):
+    """
+    Writes the output as is
+    """
+
+    name = "none"
+    extension = ""
+
+    def open(self, f: typing.BinaryIO) -> typing.BinaryIO:
+        return f
+
+    def finish(self, stream: typing.BinaryIO):
+        stream.flush()
+
+
+class GzipCompressor(Compressor):
+    name = "gzip"
+    extension = ".gz"
+
+    def open(self, f: typing.BinaryIO) -> typing.BinaryIO:
+        level = 9 if self.level is None else self.level
+        # mtime=0 keeps the output byte for byte reproducible
+        return typing.cast(
+            typing.BinaryIO,
+            gzip.GzipFile(fileobj=f, mode="wb", compresslevel=level, mtime=0),
+        )
+
+
+class Bz2Compressor(Compressor):
+    name = "bz2"
+    extension = ".bz2"
+
+    def open(self, f: typing.BinaryIO) -> typing.BinaryIO:
+        level = 9 if self.level is None else self.level
+        return typing.cast(typing.BinaryIO, bz2.BZ2File(f, "wb", compresslevel=level))
+
+
+class XzCompressor(Compressor):
+    name = "xz"
+    extension = ".xz"
+
+    def open(self, f: typing.BinaryIO) -> typing.BinaryIO:
+        return typing.cast(typing.BinaryIO, lzma.LZMAFile(f, "wb", preset=self.level))
+
+
+class ZstdCompressor(Compressor):
+    """
+    Requires Python 3.14+ or the zstandard package
+    """
+
+    name = "zstd"
+    extension = ".zst"
+
+    def open(self, f: typing.BinaryIO) -> typing.BinaryIO:
+        if zstd is not None:
+            return typing.cast(
+                typing.BinaryIO, zstd.ZstdFile(f, "wb", level=self.level)
+            )
+        if zstandard is not None:
+            level = 3 if self.level is None else self.level
+            return zstandard.ZstdCompressor(level=level).stream_writer(f, closefd=False)
+        raise RuntimeError(
+            "zstd compression requires Python 3.14+ or the zstandard package"
+        )
+
+
+_compressors: dict[str, type[Compressor]] = {}
+
+
+def register_compressor(cls: type[Compressor]) -> type[Compressor]:
+    """
+    Make a Compressor subclass available by its name. Can be used as a class decorator
+    """
+    _compressors[cls.name] = cls
+    return cls
+
+
+def compressor_names() -> list[str]:
+    return list(_compressors)
+
+
+def get_compressor(name: str, level: int | None = None) -> Compressor:
+    try:
+        return _compressors[name](level)
+    except KeyError:
+        raise ValueError(f"No such compressor {name!r}") from None
+
+
+for _cls in (
+    IdentityCompressor,
+    GzipCompressor,
+    Bz2Compressor,
+    XzCompressor,
+    ZstdCompressor,
+):
+    register_compressor(_cls)
@@ -1,10 +1,83 @@
 import abc
+import itertools
+import random
 import uuid
 import datetime
-from tag import TagGroup, Tag, TextNode
+from tag import TagGroup, Tag, TextNode, escape_text
 import typing
 
 
+class IdAllocator:
+    """
+    Hands out the element ids that specializers need during a single render.
+    Ids come from a counter so the same table always renders to byte for byte the same HTML
+    """
+
+    def __init__(self, prefix: str = "tbldis-gen-"):
+        self.prefix = prefix
+        self._counter = itertools.count()
+
+    def next_id(self) -> str:
+        return f"{self.prefix}{next(self._counter)}"
+
+    def for_row(self, row: int) -> "IdAllocator":
+        """
+        An allocator for the ids of a single row. Its ids do not depend on how many ids the other
+        rows used, so rows can be rendered in any order, or at the same time, with the same result
+        """
+        return IdAllocator(f"{self.prefix}{row}-")
+
+
+class SeededIdAllocator(IdAllocator):
+    """
+    Random looking ids that are still reproducible for a given seed. Use different seeds for
+    tables that are rendered separately but end up on the same page so their ids do not collide
+    """
+
+    def __init__(self, seed: int | str, prefix: str = "tbldis-gen-"):
+        super().__init__(prefix)
+        self.seed = seed
+        self._random: random.Random | None = None
+
+    def next_id(self) -> str:
+        if self._random is None:
+            # seeding is slow next to drawing a number and most rows never need an id
+            self._random = random.Random(self.seed)
+        return f"{self.prefix}{self._random.getrandbits(64):016x}"
+
+    def for_row(self, row: int) -> IdAllocator:
+        return SeededIdAllocator(f"{self.seed}-{row}", self.prefix)
+
+
+class RandomIdAllocator(IdAllocator):
+    """
+    A new uuid4 for every id. Used when a specializer is called outside of a render
+    """
+
+    def next_id(self) -> str:
+        return str(uuid.uuid4())
+
+    def for_row(self, row: int) -> IdAllocator:
+        return self
+
+
+class RenderContext:
+    """
+    State that belongs to a single render rather than to the specializers, which are shared
+    between renders. TableHTMLMaker creates one per render, derives one for every row from it with for_row
+    and passes that to every Specializer.parse_with_context call for the row
+    """
+
+    def __init__(self, ids: IdAllocator | None = None):
+        self.ids = ids if ids is not None else IdAllocator()
+
+    def for_row(self, row: int) -> "RenderContext":
+        """
+        The context for rendering row number row, which shares nothing that changes with the other rows
+        """
+        return RenderContext(self.ids.for_row(row))
+
+
 class Specializer(abc.ABC):
     """
     Accepts text data and returns a DOM tree rooted at a single Tag instance
@@ -60,6 +133,20 @@ class Specializer(abc.ABC):
         """
         return self.raw_parse(content[len(self.prefix_string) :])
 
+    def parse_with_context(self, content: str, context: RenderContext | None) -> Tag:
+        """
+        Parse content during a render. This is what TableHTMLMaker calls. Specializers that need the
+        state of the render, like element ids, override it; all others are parsed with parse(content)
+        """
+        return self.parse(content)
+
+    @staticmethod
+    def ids(context: RenderContext | None) -> IdAllocator:
+        """
+        The id allocator of context, or one handing out unique random ids when there is no render context
+        """
+        return context.ids if context is not None else RandomIdAllocator()
+
 
 class ColorSpecializer(Specializer):
     """
@@ -73,24 +160,27 @@ class ColorSpecializer(Specializer):
         super().__init__(keyword, indicator, delimiter)
         self.show_tooltip = show_tooltip
 
-    def raw_parse(self, data: str) -> Tag:
-        return self.parse(self.prefix_string + data)
+    def raw_parse(self, data: str, context: RenderContext | None = None) -> Tag:
+        return self.parse(self.prefix_string + data, context)
+
+    def parse_with_context(self, content: str, context: RenderContext | None) -> Tag:
+        return self.parse(content, context)
 
-    def render_main(self, uuid: uuid.UUID, data: str) -> Tag:
+    def render_main(self, id: str, data: str) -> Tag:
         return Tag(
             "div",
             children=[TextNode("&nbsp;")],
-            id=str(uuid),
+            id=id,
             Class="tbldis-gen-color-component",
             style=f"background-color: {data}; width: 45px; height: 45px",
         )
 
-    def render_tooltip(self, uuid: uuid.UUID, data: str) -> Tag:
+    def render_tooltip(self, id: str, data: str) -> Tag:
         tooltip = Tag(
             "div",
-            children=[TextNode(data)],
+            children=[TextNode(escape_text(data))],
             hidden="true",
-            id=f"sub-{uuid}",
+            id=f"sub-{id}",
             Class="tbldis-gen-tooltop",
         )
 
@@ -106,15 +196,13 @@ class ColorSpecializer(Specializer):
             let q = document.getElementById('sub-{id}')
             q.setAttribute('hidden', true)
         }}
-        """.format(
-            id=str(uuid)
-        )
+        """.format(id=id)
         script = Tag("script")
         script.appendChild(TextNode(script_content))
         return Tag("span", children=[tooltip, script])
 
-    def parse(self, content: str) -> Tag:
-        u = uuid.uuid4()
+    def parse(self, content: str, context: RenderContext | None = None) -> Tag:
+        u = self.ids(context).next_id()
         data = self.extract_data(content)
 
         if not self.show_tooltip:
@@ -174,9 +262,11 @@ class JSDateSpecializer(Specializer):
     def __init__(self, keyword: str = "jsdate", indicator="@", delimiter=""):
         super().__init__(keyword, indicator, delimiter)
 
-    def raw_parse(self, data: str) -> Tag:
-        u = uuid.uuid4()
-        print(u)
+    def parse_with_context(self, content: str, context: RenderContext | None) -> Tag:
+        return self.raw_parse(self.extract_data(content), context)
+
+    def raw_parse(self, data: str, context: RenderContext | None = None) -> Tag:
+        u = self.ids(context).next_id()
         div = Tag("div", id=f"{u}", Class="tbldis-gen")
         s = Tag("script")
 
@@ -196,8 +286,11 @@ class RandomNumberSpecializer(Specializer):
     def __init__(self, keyword: str = "rand", indicator="@", delimiter=""):
         super().__init__(keyword, indicator, delimiter)
 
-    def raw_parse(self, data: str) -> Tag:
-        u = uuid.uuid4()
+    def parse_with_context(self, content: str, context: RenderContext | None) -> Tag:
+        return self.raw_parse(self.extract_data(content), context)
+
+    def raw_parse(self, data: str, context: RenderContext | None = None) -> Tag:
+        u = self.ids(context).next_id()
         div = Tag("div", Class="tbldis-gen", id=f"{u}")
         script = Tag(
             "script",
@@ -227,7 +320,9 @@ class HTMLDataSpecializer(Specializer):
 class SelectElementSpecializer(Specializer):
     """
     Creates a select element in the table cell with corresponding options.
-    Optionally accepting JavaScript sources to take action when the select is interacted with
+    Optionally accepting JavaScript sources to take action when the select is interacted with.
+    The support_srcs and support_scripts given here are included after every select element, a
+    source given in a cell after $$ only after that cell's select element
     """
 
     def __init__(
@@ -242,27 +337,31 @@ class SelectElementSpecializer(Specializer):
         self.support_srcs: list[str] = support_srcs or list()
         self.support_scripts: list[str] = support_scripts or list()
 
-    def raw_parse(self, data: str) -> Tag:
+    def parse_with_context(self, content: str, context: RenderContext | None) -> Tag:
+        return self.raw_parse(self.extract_data(content), context)
+
+    def raw_parse(self, data: str, context: RenderContext | None = None) -> Tag:
+        srcs = self.support_srcs
         if "$$" in data:
             data, src = data.split("$$")
-            self.support_srcs.append(src)
+            srcs = [*srcs, src]
 
         options = ((i, i) if "=" not in i else (i.split("=")) for i in data.split(";"))
 
-        i = uuid.uuid4()
+        i = self.ids(context).next_id()
 
         div = Tag("div", id=f"{i}-holder", Class="tbldis-gen-select-holder")
         select = Tag("select", id=f"{i}-select")
         for value, text in options:
-            option = Tag("option", value=value, children=[TextNode(text)])
+            option = Tag("option", value=value, children=[TextNode(escape_text(text))])
             select.appendChild(option)
 
         div.appendChild(select)
 
         group = TagGroup(div)
 
-        if self.support_srcs:
-            for src in self.support_srcs:
+        if srcs:
+            for src in srcs:
                 group.appendChild(Tag("script", src=src))
 
         if self.support_scripts:
@@ -1,7 +1,24 @@
-from htmlspecializer import Specializer
+from htmlspecializer import (
+    IdAllocator,
+    RenderContext,
+    SeededIdAllocator,
+    Specializer,
+)
+from progress import ProgressHook, ProgressTracker
 from table import Table
-from tag import Tag, TextNode
-import html
+from tablerow import TableColumn, TableRow
+from tag import Tag, TextNode, escape_text
+import collections
+import concurrent.futures
+import itertools
+import time
+import typing
+
+# rows rendered by a thread at a time when rendering with threads
+THREAD_CHUNK_ROWS = 256
+
+CellRenderer: typing.TypeAlias = typing.Callable[[str, RenderContext], Tag]
+T = typing.TypeVar("T")
 
 
 class TableHTMLMaker:
@@ -10,48 +27,364 @@ class TableHTMLMaker:
     Add speciailizations using Specializer before calling render to deal with special cases in the table
     Call render() to get a root Tag representing the table. Ensure all Specializer instances are added before
     calling render()
+    Call iter_html() or write() instead of render() to serialize the table one row at a time without ever
+    building the whole DOM tree or the whole HTML string in memory
+    All three can render the rows on a number of threads, which gives exactly the same HTML because every
+    row is rendered with its own RenderContext. This only runs faster on a free threaded build of Python
     """
 
-    def __init__(self, table: "Table", specializers: list[Specializer] | None = None):
+    def __init__(
+        self,
+        table: "Table",
+        specializers: list[Specializer] | None = None,
+        seed: int | str | None = None,
+        minify: bool = False,
+        progress: ProgressHook | None = None,
+    ):
+        """
+        Element ids are numbered from a counter in every render, or are drawn from a random generator
+        seeded with seed if one is given. Either way rendering the same table gives the same HTML.
+        If minify is True, rows and cells are rendered without their class attribute, which the stylesheet
+        does not need because it selects them through the table, and iter_html() yields minified HTML.
+        progress is called with the Progress of iter_html() and write() every now and then and once at the end
+        """
         self.table = table
+        # a copy, so that add_speciailization does not change a list that other makers may be using
         self.specializers = (
             Specializer.default_speciailizers()
             if specializers is None
-            else specializers
+            else list(specializers)
         )
+        self.seed = seed
+        self.minify = minify
+        self.progress = progress
+        # the columns bound by detect_bindings, by name, to a specializer or None for plain text
+        self.bindings: dict[str, Specializer | None] = {}
+        self._escaped_headers: tuple[list[str], list[str]] = ([], [])
 
     def add_speciailization(self, *specializers: Specializer):
         self.specializers.extend(specializers)
 
-    def get_special_html(self, content: str) -> Tag:
+    def new_context(self) -> RenderContext:
+        """
+        The per render state handed to the specializers
+        """
+        if self.seed is None:
+            return RenderContext(IdAllocator())
+        return RenderContext(SeededIdAllocator(self.seed))
+
+    def get_specializer(self, content: str) -> Specializer | None:
+        """
+        The first specializer that matches content or None if content is plain text
+        """
+        for specializer in self.specializers:
+            if specializer.matches(content):
+                return specializer
+        return None
+
+    def get_special_html(
+        self, content: str, context: RenderContext | None = None
+    ) -> Tag:
         for specializer in self.specializers:
             if specializer.matches(content):
-                return specializer.parse(content)
-        return TextNode(html.escape(content))
+                return specializer.parse_with_context(content, context)
+        return TextNode(escape_text(content))
+
+    def detect_bindings(self, sample: int = 100):
+        """
+        Bind every column that is not bound yet to the specializer used by all of its first sample
+        non-empty cells, or to plain text if none of them use a specializer. Columns with a mix are left unbound.
+        The bindings found are kept in self.bindings rather than on the table's columns, which other makers
+        with other specializers may render too
+        """
+        rows = self.table.rows[:sample]
+        for index, (name, column) in enumerate(self.table.headers.items()):
+            if self._binding(name, column)[0]:
+                continue
+
+            found: set[Specializer | None] = set()
+            for row in rows:
+                if index < len(row.content) and (content := row.content[index]):
+                    found.add(self.get_specializer(content))
+                    if len(found) > 1:
+                        break
+
+            if len(found) == 1:
+                self.bindings[name] = found.pop()
+
+    def _binding(
+        self, name: str, column: TableColumn
+    ) -> tuple[bool, Specializer | None]:
+        """
+        Whether the column is bound and the specializer it is bound to, None for plain text. The binding of
+        the column itself comes first, unless it is to a specializer that this maker does not have
+        """
+        if column.plain_text:
+            return True, None
+        if column.specializer is not None and column.specializer in self.specializers:
+            return True, column.specializer
+        if name in self.bindings:
+            return True, self.bindings[name]
+        return False, None
+
+    def cell_renderers(self) -> list[CellRenderer]:
+        """
+        The function that renders the cells of each column, following the column bindings
+        """
+        return [
+            self._cell_renderer(name, column)
+            for name, column in self.table.headers.items()
+        ]
+
+    def _cell_renderer(self, name: str, column: TableColumn) -> CellRenderer:
+        get_special_html = self.get_special_html
 
-    def render(self):
-        table = Tag("table", cellspacing="0", cellpadding="0", Class="tbldis-gen")
+        bound, specializer = self._binding(name, column)
+        if not bound:
+            return get_special_html
+
+        if specializer is not None:
+
+            def render_bound(content: str, context: RenderContext) -> Tag:
+                if specializer.matches(content):
+                    return specializer.parse_with_context(content, context)
+                return get_special_html(content, context)
+
+            return render_bound
+
+        # a specializer that keeps the default prefix matching only matches cells that start
+        # with its indicator, so if all of them do, the other cells can be escaped without
+        # trying the specializers
+        if not all(
+            type(s).matches is Specializer.matches
+            and type(s).prefix_string is Specializer.prefix_string
+            for s in self.specializers
+        ):
+            return get_special_html
+        indicators = tuple({s.indicator for s in self.specializers})
+
+        def render_plain(content: str, context: RenderContext) -> Tag:
+            if content.startswith(indicators):
+                return get_special_html(content, context)
+            return TextNode(escape_text(content))
+
+        return render_plain
+
+    def render_table(self) -> Tag:
+        """
+        The empty <table> element that wraps the head and the body
+        """
+        return Tag("table", cellspacing="0", cellpadding="0", Class="tbldis-gen")
+
+    def render_head(self) -> Tag:
         thead = Tag("thead")
         tr = Tag("tr")
 
         thead.appendChild(tr)
-        table.appendChild(thead)
 
-        for item in self.table.headers:
-            tr.appendChild(Tag("th", children=[TextNode(item)], Class="tbldis-gen"))
+        for item in self.escaped_headers():
+            tr.appendChild(Tag("th", children=[TextNode(item)], **self._cell_attrs()))
+
+        return thead
+
+    def escaped_headers(self) -> list[str]:
+        """
+        The HTML escaped header names, which are only escaped again when the headers change
+        """
+        headers = list(self.table.headers)
+        if headers != self._escaped_headers[0]:
+            self._escaped_headers = (headers, [escape_text(i) for i in headers])
+        return self._escaped_headers[1]
+
+    def render_row(
+        self,
+        row: TableRow,
+        context: RenderContext,
+        renderers: list[CellRenderer] | None = None,
+    ) -> Tag:
+        if renderers is None:
+            renderers = self.cell_renderers()
+
+        attrs = self._cell_attrs()
+        tr = Tag("tr", **attrs)
+        for content, render in itertools.zip_longest(row.content, renderers):
+            if content is None:
+                break  # the row is shorter than the headers
+            if render is None:
+                render = self.get_special_html
+            td = Tag(
+                "td",
+                children=[render(content, context)],
+                **attrs,
+            )
+            tr.appendChild(td)
+        return tr
+
+    def _cell_attrs(self) -> dict[str, str]:
+        return {} if self.minify else {"Class": "tbldis-gen"}
+
+    def render(self, context: RenderContext | None = None, threads: int | None = None):
+        if context is None:
+            context = self.new_context()
+
+        table = self.render_table()
+        table.appendChild(self.render_head())
+
+        def render_rows(
+            start: int, stop: int, renderers: list[CellRenderer]
+        ) -> list[Tag]:
+            return [
+                self.render_row(self.table.rows[i], context.for_row(i), renderers)
+                for i in range(start, stop)
+            ]
 
         tbody = Tag("tbody")
-        for row in self.table.rows:
-            tr = Tag("tr", Class="tbldis-gen")
-            for content in row:
-                td = Tag(
-                    "td",
-                    Class="tbldis-gen",
-                    children=[self.get_special_html(content)],
-                )
-                tr.appendChild(td)
-            tbody.appendChild(tr)
+        for _, rows in self._map_row_chunks(render_rows, threads):
+            for row in rows:
+                tbody.appendChild(row)
 
         table.appendChild(tbody)
 
         return table
+
+    def iter_html(
+        self,
+        context: RenderContext | None = None,
+        threads: int | None = None,
+        deadline: float | None = None,
+    ) -> typing.Iterator[str]:
+        """
+        Yields the same HTML as render().html(minify) in pieces, one table row at a time,
+        or one chunk of rows at a time when rendering with threads.
+        If the deadline, a time.monotonic() value, passes before every row is rendered, the rows rendered
+        so far are followed by the row from render_truncated_row() and the table is closed as usual.
+        So are the rows of a table whose loading stopped at a deadline
+        """
+        if context is None:
+            context = self.new_context()
+
+        table = self.render_table()
+        tbody = Tag("tbody")
+
+        minify = self.minify
+        separator = "" if minify else "\n"
+        total = len(self.table.rows)
+        tracker = (
+            ProgressTracker(self.progress, "render", total)
+            if self.progress is not None
+            else None
+        )
+
+        def render_rows(start: int, stop: int, renderers: list[CellRenderer]) -> str:
+            return separator.join(
+                self.render_row(self.table.rows[i], context.for_row(i), renderers).html(
+                    minify
+                )
+                for i in range(start, stop)
+            )
+
+        yield table.open_tag()
+        yield self.render_head().html(minify)
+        yield separator
+        yield tbody.open_tag()
+
+        rendered = 0
+        if threads is None or threads <= 1:
+            renderers = self.cell_renderers()
+            for index, row in enumerate(self.table.rows):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                if index:
+                    yield separator
+                yield self.render_row(row, context.for_row(index), renderers).html(
+                    minify
+                )
+                rendered = index + 1
+                if tracker is not None:
+                    tracker.update(rendered)
+        else:
+            for stop, chunk in self._map_row_chunks(render_rows, threads):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                if rendered:
+                    yield separator
+                yield chunk
+                rendered = stop
+                if tracker is not None:
+                    tracker.update(rendered)
+
+        truncated = rendered < total or self.table.truncated
+        if truncated:
+            if rendered:
+                yield separator
+            yield self.render_truncated_row(rendered).html(minify)
+        yield tbody.close_tag()
+        yield table.close_tag()
+
+        if tracker is not None:
+            tracker.finish(rendered, truncated)
+
+    def render_truncated_row(self, rendered: int) -> Tag:
+        """
+        The row that ends a table whose loading or rendering ran out of time after rendered rows
+        """
+        if self.table.truncated:
+            # the number of rows in the input is not known
+            text = f"Truncated: ran out of time after {rendered:,} rows"
+        else:
+            text = f"Truncated: ran out of time after {rendered:,} of {len(self.table.rows):,} rows"
+        td = Tag(
+            "td",
+            children=[TextNode(text)],
+            colspan=str(max(len(self.table.headers), 1)),
+        )
+        return Tag("tr", children=[td], Class="tbldis-gen-truncated")
+
+    def write(
+        self,
+        f: typing.TextIO,
+        threads: int | None = None,
+        deadline: float | None = None,
+    ):
+        """
+        Write the table HTML to the text file f as it is rendered
+        """
+        for chunk in self.iter_html(threads=threads, deadline=deadline):
+            f.write(chunk)
+
+    def _map_row_chunks(
+        self,
+        render_rows: typing.Callable[[int, int, list[CellRenderer]], T],
+        threads: int | None,
+    ) -> typing.Iterator[tuple[int, T]]:
+        """
+        Calls render_rows(start, stop, renderers) for consecutive ranges of the rows and yields stop and the
+        result for each in order. With more than one thread the ranges are rendered on a thread pool that only
+        gets a few more ranges than it has threads at a time, so output does not pile up in front of a slow consumer
+        """
+        renderers = self.cell_renderers()
+        count = len(self.table.rows)
+        if threads is None or threads <= 1:
+            yield count, render_rows(0, count, renderers)
+            return
+
+        starts = iter(range(0, count, THREAD_CHUNK_ROWS))
+        pool = concurrent.futures.ThreadPoolExecutor(threads)
+
+        def submit(start: int) -> tuple[int, "concurrent.futures.Future[T]"]:
+            stop = min(start + THREAD_CHUNK_ROWS, count)
+            return stop, pool.submit(render_rows, start, stop, renderers)
+
+        try:
+            pending = collections.deque(
+                submit(start) for start in itertools.islice(starts, threads * 2)
+            )
+            while pending:
+                stop, future = pending.popleft()
+                result = future.result()
+                if (start := next(starts, None)) is not None:
+                    pending.append(submit(start))
+                yield stop, result
+        finally:
+            # a consumer that stops early does not need the ranges that are still queued
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,68 @@
+import typing
+from tag import Tag, TextNode, compact_css
+
+STYLESHEET_MARKER = "%{{ stylesheet }}"
+CONTENT_MARKER = "%{{ table-content }}"
+
+
+class HTMLTemplate:
+    """
+    The page template and stylesheet that rendered tables are wrapped in.
+    The template is split around the table content marker once so that the table HTML can be
+    streamed between the two halves instead of being substituted into the page as one string.
+    If minify is True, the indentation of the template and the comments and whitespace of the
+    stylesheet are removed
+    """
+
+    def __init__(self, template: str, stylesheet: str, minify: bool = False):
+        if minify:
+            template = "".join(line.strip() for line in template.splitlines())
+            stylesheet = compact_css(stylesheet)
+
+        self.template = template
+        self.stylesheet = stylesheet
+        self.minify = minify
+
+        page = template.replace(STYLESHEET_MARKER, stylesheet)
+        self.head, _, self.tail = page.partition(CONTENT_MARKER)
+
+    @classmethod
+    def from_files(
+        cls,
+        template_filename: str = "support/template.html",
+        stylesheet_filename: str = "support/style.css",
+        minify: bool = False,
+    ):
+        with open(template_filename) as f:
+            template = f.read()
+
+        with open(stylesheet_filename) as g:
+            style = g.read()
+
+        return cls(template, style, minify)
+
+    def fill(self, content: str) -> str:
+        return "".join(self.iter_document([content]))
+
+    def iter_document(self, content: typing.Iterable[str]) -> typing.Iterator[str]:
+        """
+        Yields the full HTML page with the pieces of content in place of the table content marker
+        """
+        yield self.head
+        yield from content
+        yield self.tail
+
+    def iter_partial(self, content: typing.Iterable[str]) -> typing.Iterator[str]:
+        """
+        Yields only a <style> element and a holder <div> with the pieces of content inside of it
+        for insertion into an existing HTML document
+        """
+        style = Tag("style", children=[TextNode(self.stylesheet)])
+        div = Tag("div", id="tbldis-gen-holder", Class="tbldis-gen-holder")
+
+        yield style.html()
+        if not self.minify:
+            yield "\n"
+        yield div.open_tag()
+        yield from content
+        yield div.close_tag()
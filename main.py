@@ -1,13 +1,29 @@
 import argparse
+import contextlib
 import csv
-import uuid
+import datetime
+import hashlib
+import io
+import itertools
+import os
+import parallelcsv
+import rendercache
+import shutil
+import sys
+import tempfile
+import time
+import typing
+from compressors import Compressor, compressor_names, get_compressor
 from htmlspecializer import Specializer
+from htmltemplate import HTMLTemplate
 from table import Table
 from htmltable import TableHTMLMaker
+from progress import Budgeted, Progress, ProgressHook, ProgressPrinter
+from query import Condition, Query
 
 import base64
 
-from tag import Tag, TagGroup, TextNode
+from tag import Tag, TextNode
 
 
 class Base64DataSpecializer(Specializer):
@@ -18,32 +34,236 @@ class Base64DataSpecializer(Specializer):
         return TextNode(str(base64.b64decode(data), encoding="utf-8"))
 
 
+def make_specializers() -> list[Specializer]:
+    return Specializer.default_speciailizers() + [Base64DataSpecializer()]
+
+
 def fill_template(content):
-    with open("support/template.html") as f:
-        template = f.read()
+    return HTMLTemplate.from_files().fill(content)
+
 
-    with open("support/style.css") as g:
-        style = g.read()
+def make_partial(content):
+    return "".join(HTMLTemplate.from_files().iter_partial([content]))
 
-    template = template.replace("%{{ stylesheet }}", style)
-    template = template.replace("%{{ table-content }}", content)
 
-    return template
+# the command line options that change the output. The input file is accounted for by its contents
+OUTPUT_OPTIONS = (
+    "partial",
+    "compress",
+    "compress_level",
+    "minify",
+    "seed",
+    "where",
+    "sort_by",
+    "desc",
+    "limit",
+)
 
+# bump when a change to the rendering code changes its output, so that outputs cached
+# by the old code are not served any more
+RENDER_FORMAT_VERSION = 1
 
-def make_partial(content):
-    with open("support/style.css") as g:
-        style = g.read()
 
-    style = Tag("style", children=[TextNode(style)])
-    div = Tag(
-        "div",
-        id="tbldis-gen-holder",
-        Class="tbldis-gen-holder",
-        children=[TextNode(content)],
+@contextlib.contextmanager
+def open_output(
+    f: typing.BinaryIO, compressor: Compressor
+) -> typing.Iterator[typing.TextIO]:
+    """
+    Wrap the binary file f for writing text through compressor
+    """
+    stream = compressor.open(f)
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+        compressor.finish(stream)
+
+
+@contextlib.contextmanager
+def open_destination(filename: str | None) -> typing.Iterator[typing.BinaryIO]:
+    """
+    Open filename, or stdout if filename is None, for writing bytes. The file is written under a temporary
+    name next to filename, which it only replaces once the block finishes without an error, so a render that
+    fails or is interrupted never leaves a half written file behind
+    """
+    if not filename:
+        yield sys.stdout.buffer
+        return
+
+    fd, temporary = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(filename)), suffix=".tmp"
+    )
+    try:
+        # mkstemp makes the file private, give it the permissions open() would have
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary, 0o666 & ~umask)
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(temporary, filename)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+class TeeWriter(io.RawIOBase):
+    """
+    A binary stream that writes everything written to it to each of files
+    """
+
+    def __init__(self, *files: typing.BinaryIO):
+        self.files = files
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        for f in self.files:
+            f.write(b)
+        return len(b)
+
+    def flush(self):
+        for f in self.files:
+            f.flush()
+
+
+def make_progress_hook(args) -> ProgressHook | None:
+    """
+    Shows the progress of loading and rendering on stderr with --progress. Either way, warns on stderr
+    if --time-budget cut the table short
+    """
+    if not args.progress and args.time_budget is None:
+        return None
+
+    printer = ProgressPrinter(sys.stderr) if args.progress else None
+
+    def hook(progress: Progress):
+        if printer is not None:
+            printer(progress)
+        elif progress.truncated:
+            print(
+                f"Warning: the time budget ran out after {progress.rows:,} rows ({progress.stage}), the table is truncated",
+                file=sys.stderr,
+            )
+
+    return hook
+
+
+def render_key(
+    args,
+    template: HTMLTemplate,
+    specializers: list[Specializer],
+    to_stdout: bool,
+) -> str:
+    """
+    The render cache key for the output of args: everything that can change a single byte of it
+    """
+    with open(args.input, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").digest()
+
+    configuration = [
+        (type(s).__module__, type(s).__qualname__, sorted(vars(s).items()))
+        for s in specializers
+    ]
+    options = [(name, getattr(args, name)) for name in OUTPUT_OPTIONS]
+
+    return rendercache.make_key(
+        str(RENDER_FORMAT_VERSION),
+        digest,
+        template.template,
+        template.stylesheet,
+        repr(configuration),
+        repr(options),
+        repr(to_stdout),  # stdout gets a trailing newline
+        # @pydate renders the date of the render
+        datetime.date.today().isoformat(),
     )
 
-    return TagGroup(style, div).html()
+
+def render(
+    args,
+    f: typing.BinaryIO,
+    template: HTMLTemplate,
+    specializers: list[Specializer],
+    to_stdout: bool,
+    progress: ProgressHook | None = None,
+    deadline: float | None = None,
+):
+    table = load_table(args, progress, deadline)
+    htmler = TableHTMLMaker(
+        table, specializers, seed=args.seed, minify=args.minify, progress=progress
+    )
+    if args.detect_columns > 0:
+        htmler.detect_bindings(args.detect_columns)
+    compressor = get_compressor(args.compress, args.compress_level)
+
+    content = htmler.iter_html(threads=args.threads, deadline=deadline)
+    if args.partial:
+        document = template.iter_partial(content)
+    else:
+        document = template.iter_document(content)
+
+    with open_output(f, compressor) as g:
+        for chunk in document:
+            g.write(chunk)
+        if to_stdout:
+            g.write("\n")
+
+
+def load_table(
+    args, progress: ProgressHook | None = None, deadline: float | None = None
+) -> Table:
+    """
+    Load the input with the query of args applied. If the deadline passes while the input is read,
+    the rest of it is skipped and the table is marked truncated
+    """
+    query = Query(
+        [Condition.parse(i) for i in args.where],
+        args.sort_by,
+        args.desc,
+        args.limit,
+    )
+    if not query:
+        return Table.from_filename(
+            args.input,
+            cache=args.table_cache,
+            workers=args.jobs,
+            progress=progress,
+            deadline=deadline,
+        )
+
+    def apply(
+        rows: typing.Iterable[list[str]],
+        truncated: bool = False,
+        progress: ProgressHook | None = progress,
+    ) -> Table:
+        # a sort reads every row before passing any on, so the budget is checked on the way in
+        budgeted = Budgeted(rows, deadline)
+        table = Table.from_csv_reader(query.apply_csv(budgeted), progress=progress)
+        table.truncated = truncated or budgeted.expired
+        return table
+
+    if args.table_cache:
+        table = Table.from_filename(
+            args.input,
+            cache=True,
+            workers=args.jobs,
+            progress=progress,
+            deadline=deadline,
+        )
+        rows = itertools.chain(
+            [list(table.headers)], (row.content for row in table.rows)
+        )
+        # the load of the cached table already reported its progress
+        return apply(rows, table.truncated, progress=None)
+
+    if args.jobs is not None and args.jobs > 1:
+        return apply(parallelcsv.read_rows(args.input, args.jobs))
+
+    with open(args.input, newline="", encoding="utf-8") as f:
+        return apply(csv.reader(f))
 
 
 def parse_args():
@@ -60,34 +280,164 @@ def parse_args():
         action="store_true",
         help="Output only the Table HTML with styling for insertion into an existing HTML document",
     )
+    ap.add_argument(
+        "-c",
+        "--compress",
+        choices=compressor_names(),
+        default="none",
+        help="Compress the output as it is written. The extension of the format, e.g. .gz, is added to the output filename",
+    )
+    ap.add_argument(
+        "--compress-level",
+        type=int,
+        default=None,
+        help="Compression level passed to the codec chosen with --compress",
+    )
+    ap.add_argument(
+        "-m",
+        "--minify",
+        action="store_true",
+        help="Leave out whitespace between elements, compact scripts and styles and drop redundant attributes",
+    )
+    ap.add_argument(
+        "--table-cache",
+        action="store_true",
+        help="Load the parsed input from a binary cache stored next to it, creating or refreshing the cache as needed",
+    )
+    ap.add_argument(
+        "--seed",
+        help="Derive element ids from this seed instead of a counter. Use different seeds for tables that will share a page",
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Parse the input in this many processes. Worth it for inputs of hundreds of megabytes or more",
+    )
+    ap.add_argument(
+        "-w",
+        "--where",
+        action="append",
+        default=[],
+        metavar="CONDITION",
+        help="Only render rows matching a condition like status=active or score>=10. May be repeated, all must match",
+    )
+    ap.add_argument("--sort-by", metavar="COLUMN", help="Sort rows by COLUMN")
+    ap.add_argument(
+        "--desc", action="store_true", help="Sort in descending order with --sort-by"
+    )
+    ap.add_argument(
+        "--limit", type=int, help="Render at most this many rows (after sorting)"
+    )
+    ap.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        help="Render the rows on this many threads. Only faster on a free threaded build of Python",
+    )
+    ap.add_argument(
+        "--detect-columns",
+        type=int,
+        default=100,
+        metavar="ROWS",
+        help="Sample this many rows to find columns that use one specializer throughout and render them without trying the others. 0 turns this off",
+    )
+    ap.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show how many rows have been loaded and rendered, how fast and how long is left on stderr",
+    )
+    ap.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="Stop loading and rendering rows once this many seconds have passed and end the table with a row saying it was truncated. Turns off the render cache",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always render, do not read or write the render cache",
+    )
+    ap.add_argument(
+        "--cache-dir",
+        help=f"Directory of the render cache. Defaults to {rendercache.default_directory()}",
+    )
+    ap.add_argument(
+        "--render-cache-size",
+        type=int,
+        default=512,
+        help="Megabytes the render cache may use before the least recently used outputs are removed",
+    )
+
+    commands = ap.add_subparsers(dest="command")
+    sp = commands.add_parser(
+        "serve",
+        help="Keep running and render CSV sent over HTTP. POST the CSV to /render or GET /render?path=FILE",
+    )
+    sp.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    sp.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    sp.add_argument(
+        "--root",
+        default=".",
+        help="Directory that paths given with ?path= are relative to and confined to",
+    )
+    sp.add_argument(
+        "--cache-size",
+        type=int,
+        default=64,
+        help="Megabytes of rendered responses to keep in memory",
+    )
     return ap.parse_args()
 
 
 def main():
     args = parse_args()
 
-    with open(args.input) as f:
-        data = csv.reader(f)
-        f = Table.from_csv_reader(data)
+    if args.command == "serve":
+        import server
 
-    htmler = TableHTMLMaker(f)
-    htmler.add_speciailization(Base64DataSpecializer())
+        app = server.RenderServer(
+            make_specializers(),
+            root=args.root,
+            cache_size=args.cache_size * 2**20,
+        )
+        server.serve(app, args.host, args.port)
+        return
 
-    tree = htmler.render()
+    deadline = None
+    if args.time_budget is not None:
+        deadline = time.monotonic() + args.time_budget
 
-    if args.partial:
-        if args.output:
-            with open(args.output + "-partial", "w") as g:
-                g.write(make_partial(tree.html()))
-        else:
-            print(make_partial(tree.html()))
-    else:
-        content = fill_template(tree.html())
-        if args.output:
-            with open(args.output, "w") as g:
-                g.write(content)
-        else:
-            print(content)
+    template = HTMLTemplate.from_files(minify=args.minify)
+    specializers = make_specializers()
+    progress = make_progress_hook(args)
+
+    output = args.output
+    if output and args.partial:
+        output += "-partial"
+    extension = get_compressor(args.compress, args.compress_level).extension
+    if output and not output.endswith(extension):
+        output += extension
+    to_stdout = output is None
+
+    with open_destination(output) as out:
+        # a budgeted render skips the cache, hashing the input for the key would take time out of the budget,
+        # and what gets rendered in time differs from run to run, so it is not worth keeping
+        if args.no_cache or deadline is not None:
+            render(args, out, template, specializers, to_stdout, progress, deadline)
+            return
+
+        cache = rendercache.RenderCache(args.cache_dir, args.render_cache_size * 2**20)
+        key = render_key(args, template, specializers, to_stdout)
+        if (cached := cache.open(key)) is not None:
+            with cached:
+                shutil.copyfileobj(cached, out)
+            return
+
+        # the output goes out as it is rendered and into the cache at the same time
+        with cache.store(key) as cached:
+            tee = typing.cast(typing.BinaryIO, TeeWriter(out, cached))
+            render(args, tee, template, specializers, to_stdout, progress)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+import concurrent.futures
+import csv
+import gc
+import io
+import marshal
+import os
+import typing
+
+# how much of the file to scan at a time while looking for record boundaries
+BLOCK_SIZE = 1024 * 1024
+
+
+def find_record_boundaries(
+    filename: str, count: int, quotechar: bytes = b'"'
+) -> list[int]:
+    """
+    Returns the byte offsets that split filename into at most count pieces of about equal size
+    that each hold only complete records, starting with 0 and ending with the size of the file.
+
+    A line break only ends a record if it is outside of a quoted field, which is the case exactly
+    when an even number of quote characters comes before it (a quote inside of a quoted field is
+    written as two quotes). So the whole file is scanned once counting quotes, which is much cheaper
+    than parsing it, and each piece ends at the first line break after its target size with an even count
+    """
+    size = os.path.getsize(filename)
+    targets = [size * i // count for i in range(1, count)]
+    boundaries = [0]
+    quotes = 0  # number of quote characters before offset
+    offset = 0
+
+    with open(filename, "rb") as f:
+        for target in targets:
+            if target < boundaries[-1]:
+                continue  # the previous piece already ran past this target
+
+            while offset < target:
+                block = f.read(min(BLOCK_SIZE, target - offset))
+                if not block:
+                    break
+                quotes += block.count(quotechar)
+                offset += len(block)
+
+            boundary = None
+            while boundary is None and (block := f.read(BLOCK_SIZE)):
+                position = 0
+                while (newline := block.find(b"\n", position)) >= 0:
+                    quotes += block.count(quotechar, position, newline)
+                    position = newline + 1
+                    if quotes % 2 == 0:
+                        boundary = offset + position
+                        break
+                else:
+                    quotes += block.count(quotechar, position)
+                    offset += len(block)
+
+            if boundary is None or boundary >= size:
+                break
+            boundaries.append(boundary)
+            offset = boundary
+            f.seek(boundary)
+
+    boundaries.append(size)
+    return boundaries
+
+
+def parse_range(
+    filename: str,
+    start: int,
+    end: int,
+    encoding: str = "utf-8",
+    dialect: str | csv.Dialect = "excel",
+    **fmtparams,
+) -> list[list[str]]:
+    """
+    Parse the records between the byte offsets start and end of filename
+    """
+    with open(filename, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    text = io.StringIO(data.decode(encoding), newline="")
+    return list(csv.reader(text, dialect, **fmtparams))
+
+
+def _parse_range_marshalled(*args, **fmtparams) -> bytes:
+    # marshal serializes lists of strings several times faster than pickle, which
+    # would otherwise be used to send the rows back from the worker
+    return marshal.dumps(parse_range(*args, **fmtparams))
+
+
+_dialect_attributes = (
+    "delimiter",
+    "doublequote",
+    "escapechar",
+    "lineterminator",
+    "quotechar",
+    "quoting",
+    "skipinitialspace",
+    "strict",
+)
+
+
+def _fmtparams(dialect: str | csv.Dialect) -> dict[str, typing.Any]:
+    # the workers get the dialect as plain values, a Dialect subclass may not be importable there
+    if isinstance(dialect, str):
+        dialect = csv.get_dialect(dialect)
+    return {
+        name: getattr(dialect, name)
+        for name in _dialect_attributes
+        if hasattr(dialect, name)
+    }
+
+
+def _quote_byte(encoding: str, dialect: str | csv.Dialect) -> bytes | None:
+    """
+    The single byte that the quote character of dialect is encoded to, or None if the file can not
+    be split by looking at its bytes: the encoding writes line breaks or the quote character as more
+    than one byte, or quotes are escaped rather than doubled so counting them says nothing
+    """
+    if isinstance(dialect, str):
+        dialect = csv.get_dialect(dialect)
+    if dialect.quotechar is None or dialect.quoting == csv.QUOTE_NONE:
+        return None
+    if not dialect.doublequote or dialect.escapechar is not None:
+        return None
+    try:
+        newline = "\n".encode(encoding)
+        quote = dialect.quotechar.encode(encoding)
+    except UnicodeEncodeError:
+        return None
+    if newline != b"\n" or len(quote) != 1 or quote == b"\n":
+        return None
+    return quote
+
+
+class RowReader:
+    """
+    Iterates over every record of the CSV file filename in order, like csv.reader would, but parses pieces
+    of the file in parallel in a pool of worker processes. The file is split into more pieces than
+    there are workers so that a slow piece does not hold up the others.
+    Quoted fields may contain line breaks, but quote characters must only appear in quoted fields.
+    Files that can not be split that way, see _quote_byte, are read by a single csv.reader instead
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        workers: int | None = None,
+        encoding: str = "utf-8",
+        dialect: str | csv.Dialect = "excel",
+        chunks_per_worker: int = 4,
+    ):
+        self.filename = filename
+        self.workers = workers or os.cpu_count() or 1
+        self.encoding = encoding
+        self.dialect = dialect
+        self.chunks_per_worker = chunks_per_worker
+        self._tell: typing.Callable[[], int] = lambda: 0
+
+    def tell(self) -> int:
+        """
+        The byte offset in the file up to which records have been handed out, give or take one piece
+        """
+        return self._tell()
+
+    def __iter__(self) -> typing.Iterator[list[str]]:
+        filename, encoding, dialect = self.filename, self.encoding, self.dialect
+        if (quotechar := _quote_byte(encoding, dialect)) is None:
+            with open(filename, newline="", encoding=encoding) as f:
+                self._tell = f.buffer.tell
+                yield from csv.reader(f, dialect)
+            return
+
+        boundaries = find_record_boundaries(
+            filename, self.workers * self.chunks_per_worker, quotechar
+        )
+        ranges = list(zip(boundaries, boundaries[1:]))
+        fmtparams = _fmtparams(dialect)
+
+        # the workers only build lists of strings, none of which are garbage
+        pool = concurrent.futures.ProcessPoolExecutor(
+            self.workers, initializer=gc.disable
+        )
+        try:
+            futures = [
+                pool.submit(
+                    _parse_range_marshalled,
+                    filename,
+                    start,
+                    end,
+                    encoding,
+                    "excel",
+                    **fmtparams,
+                )
+                for start, end in ranges
+            ]
+            for (_, end), future in zip(ranges, futures):
+                rows = marshal.loads(future.result())
+                self._tell = lambda end=end: end
+                yield from rows
+        finally:
+            # a reader that stops early does not need the pieces that are still queued
+            pool.shutdown(cancel_futures=True)
+
+
+def read_rows(
+    filename: str,
+    workers: int | None = None,
+    encoding: str = "utf-8",
+    dialect: str | csv.Dialect = "excel",
+    chunks_per_worker: int = 4,
+) -> typing.Iterator[list[str]]:
+    """
+    Yields every record of the CSV file filename in order, see RowReader
+    """
+    return iter(RowReader(filename, workers, encoding, dialect, chunks_per_worker))
@@ -0,0 +1,162 @@
+import sys
+import time
+import typing
+
+T = typing.TypeVar("T")
+
+
+class Progress(typing.NamedTuple):
+    """
+    How far a long running stage (loading or rendering a table) has got
+    """
+
+    stage: str
+    rows: int
+    elapsed: float
+    # the part of the work that is done, between 0 and 1, or None if it is not known
+    fraction: float | None = None
+    finished: bool = False
+    # True if the stage stopped before it was done because it ran out of time
+    truncated: bool = False
+
+    @property
+    def rate(self) -> float:
+        """
+        Rows per second
+        """
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """
+        Estimated seconds until the stage is done, or None if that can not be estimated
+        """
+        if self.finished:
+            return 0.0
+        if not self.fraction:
+            return None
+        return self.elapsed * (1 - self.fraction) / self.fraction
+
+
+ProgressHook: typing.TypeAlias = typing.Callable[[Progress], None]
+
+
+class ProgressTracker:
+    """
+    Calls hook with the Progress of a stage at most once every interval seconds, and once more when the
+    stage finishes. If total is given, the fraction that is done is rows / total
+    """
+
+    def __init__(
+        self,
+        hook: ProgressHook,
+        stage: str,
+        total: int | None = None,
+        interval: float = 0.5,
+    ):
+        self.hook = hook
+        self.stage = stage
+        self.total = total
+        self.interval = interval
+        self.start = time.monotonic()
+        self._next_report = self.start + interval
+
+    def _fraction(self, rows: int) -> float | None:
+        if not self.total:
+            return None
+        return min(rows / self.total, 1.0)
+
+    def update(self, rows: int, fraction: float | None = None):
+        now = time.monotonic()
+        if now < self._next_report:
+            return
+        self._next_report = now + self.interval
+        if fraction is None:
+            fraction = self._fraction(rows)
+        self.hook(Progress(self.stage, rows, now - self.start, fraction))
+
+    def finish(self, rows: int, truncated: bool = False):
+        elapsed = time.monotonic() - self.start
+        fraction = self._fraction(rows) if truncated else 1.0
+        self.hook(Progress(self.stage, rows, elapsed, fraction, True, truncated))
+
+    def track(
+        self,
+        items: typing.Iterable[T],
+        fraction: typing.Callable[[], float] | None = None,
+        every: int = 1024,
+    ) -> typing.Iterator[T]:
+        """
+        Yields items, updating the progress after every every items and finishing once they run out.
+        fraction is called for the part of the work that is done, if the number of items is not known up front
+        """
+        rows = 0
+        for rows, item in enumerate(items, 1):
+            if rows % every == 0:
+                self.update(rows, fraction() if fraction is not None else None)
+            yield item
+        self.finish(rows)
+
+
+class Budgeted(typing.Generic[T]):
+    """
+    Iterates over items until deadline, a time.monotonic() value, passes. The clock is read every every items,
+    the first item is always let through. Afterwards expired tells whether the items were cut short.
+    A deadline of None lets every item through
+    """
+
+    def __init__(
+        self, items: typing.Iterable[T], deadline: float | None, every: int = 256
+    ):
+        self.items = items
+        self.deadline = deadline
+        self.every = every
+        self.expired = False
+
+    def __iter__(self) -> typing.Iterator[T]:
+        if self.deadline is None:
+            yield from self.items
+            return
+        for count, item in enumerate(self.items):
+            if count and count % self.every == 0 and time.monotonic() >= self.deadline:
+                self.expired = True
+                return
+            yield item
+
+
+def _duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02}m{seconds:02}s"
+    if minutes:
+        return f"{minutes}m{seconds:02}s"
+    return f"{seconds}s"
+
+
+class ProgressPrinter:
+    """
+    A ProgressHook that writes one line per report to f. On a terminal the line is rewritten in place
+    """
+
+    def __init__(self, f: typing.TextIO | None = None):
+        self.f = f if f is not None else sys.stderr
+        self.rewrite = self.f.isatty()
+
+    def __call__(self, progress: Progress):
+        line = f"{progress.stage}: {progress.rows:,} rows, {progress.rate:,.0f} rows/s"
+        if progress.fraction is not None:
+            line += f", {progress.fraction:.0%}"
+        if progress.truncated:
+            line += ", stopped early: out of time"
+        elif progress.finished:
+            line += f", done in {_duration(progress.elapsed)}"
+        elif (eta := progress.eta) is not None:
+            line += f", ETA {_duration(eta)}"
+
+        if self.rewrite:
+            end = "\n" if progress.finished else ""
+            self.f.write(f"\r\x1b[K{line}{end}")
+        else:
+            self.f.write(line + "\n")
+        self.f.flush()
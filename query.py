@@ -0,0 +1,149 @@
+import heapq
+import itertools
+import operator
+import re
+import typing
+
+Row: typing.TypeAlias = list[str]
+
+_condition = re.compile(
+    r"^\s*(?P<column>.+?)\s*(?P<op>==|!=|<=|>=|=|<|>)\s*(?P<value>.*?)\s*$"
+)
+
+_operators: dict[str, typing.Callable[[typing.Any, typing.Any], bool]] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _number(value: str) -> float | None:
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return None if number != number else number  # NaN does not order
+
+
+def sort_key(value: str) -> tuple[int, float | str]:
+    """
+    Numbers sort numerically and before all other values, which sort as text
+    """
+    if (number := _number(value)) is not None:
+        return (0, number)
+    return (1, value)
+
+
+class Condition:
+    """
+    A single comparison of a column against a value, e.g. "status=active" or "score>=10".
+    The comparison is numeric if both sides are numbers and textual otherwise
+    """
+
+    def __init__(self, column: str, op: str, value: str):
+        if op not in _operators:
+            raise ValueError(f"No such operator {op!r}")
+        self.column = column
+        self.op = op
+        self.value = value
+        self.number = _number(value)
+        self.compare = _operators[op]
+
+    @classmethod
+    def parse(cls, expression: str):
+        if (match := _condition.match(expression)) is None:
+            raise ValueError(
+                f"Invalid condition {expression!r}, expected COLUMN OP VALUE with OP one of {list(_operators)}"
+            )
+        return cls(match["column"], match["op"], match["value"])
+
+    def matches(self, value: str) -> bool:
+        if self.number is not None and (number := _number(value)) is not None:
+            return self.compare(number, self.number)
+        return self.compare(value, self.value)
+
+    def __repr__(self) -> str:
+        return "Condition({!r}, {!r}, {!r})".format(self.column, self.op, self.value)
+
+
+class Query:
+    """
+    Filters, sorts and limits the rows of a CSV file as they are read.
+    Rows are filtered one at a time, a sort with a limit only ever keeps the best limit rows on
+    a heap, and a limit without a sort stops reading the input once enough rows have been seen
+    """
+
+    def __init__(
+        self,
+        where: list[Condition] | None = None,
+        sort_by: str | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+    ):
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
+        self.where = where or []
+        self.sort_by = sort_by
+        self.descending = descending
+        self.limit = limit
+
+    def __bool__(self) -> bool:
+        return bool(self.where) or self.sort_by is not None or self.limit is not None
+
+    def apply(
+        self, headers: list[str], rows: typing.Iterable[Row]
+    ) -> typing.Iterator[Row]:
+        """
+        The rows that pass every condition in order, or sorted if sort_by is set, and at most limit of them
+        """
+        if self.where:
+            rows = self._filter(headers, rows)
+
+        if self.sort_by is not None:
+            key = self._sort_key(headers)
+            if self.limit is None:
+                return iter(sorted(rows, key=key, reverse=self.descending))
+            select = heapq.nlargest if self.descending else heapq.nsmallest
+            return iter(select(self.limit, rows, key=key))
+
+        if self.limit is not None:
+            return itertools.islice(rows, self.limit)
+        return iter(rows)
+
+    def apply_csv(self, reader: typing.Iterable[Row]) -> typing.Iterator[Row]:
+        """
+        Apply the query to a csv.reader or anything like it, passing the header row through
+        """
+        reader = iter(reader)
+        headers = next(reader)
+        return itertools.chain([headers], self.apply(headers, reader))
+
+    def _filter(
+        self, headers: list[str], rows: typing.Iterable[Row]
+    ) -> typing.Iterator[Row]:
+        checks = [(_index(headers, c.column), c.matches) for c in self.where]
+        for row in rows:
+            for index, matches in checks:
+                if index >= len(row) or not matches(row[index]):
+                    break
+            else:
+                yield row
+
+    def _sort_key(self, headers: list[str]) -> typing.Callable[[Row], tuple]:
+        index = _index(headers, typing.cast(str, self.sort_by))
+        return lambda row: sort_key(_get(row, index) or "")
+
+
+def _index(headers: list[str], column: str) -> int:
+    try:
+        return headers.index(column)
+    except ValueError:
+        raise ValueError(f"No such column {column!r}") from None
+
+
+def _get(row: Row, index: int) -> str | None:
+    return row[index] if index < len(row) else None
@@ -0,0 +1,96 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+import typing
+
+SUFFIX = ".out"
+
+
+def default_directory() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "table-gen", "renders")
+
+
+def make_key(*parts: str | bytes) -> str:
+    """
+    Hash the parts into a cache key. Each part is length prefixed so that
+    moving bytes from one part into the next changes the key
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Rendered output stored on disk under the hash of everything that went into it.
+    When the cache grows past max_bytes, the least recently used entries are removed.
+    The modification time of an entry is its last use
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int = 512 * 2**20):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def open(self, key: str) -> typing.BinaryIO | None:
+        """
+        The stored output for key opened for reading, or None if there is none
+        """
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return f
+
+    @contextlib.contextmanager
+    def store(self, key: str) -> typing.Iterator[typing.BinaryIO]:
+        """
+        Yields a temporary file to write the output for key to. If the block finishes without an error,
+        the file becomes the entry for key, otherwise it is thrown away. The file is opened for reading
+        too so that the output can be copied elsewhere before the block ends
+        """
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w+b") as f:
+                yield f
+            os.replace(temporary, self._path(key))
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_bytes
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(SUFFIX):
+                    continue
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            total -= size
@@ -0,0 +1,233 @@
+import collections
+import csv
+import datetime
+import hashlib
+import io
+import os
+import socketserver
+import threading
+import typing
+import urllib.parse
+import wsgiref.simple_server
+
+from htmlspecializer import Specializer
+from htmltable import TableHTMLMaker
+from htmltemplate import HTMLTemplate
+from table import Table
+import tag
+
+# responses are sent in pieces of about this many bytes instead of one piece per table row
+CHUNK_SIZE = 64 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class RenderOptions(typing.NamedTuple):
+    partial: bool = False
+    minify: bool = False
+    seed: str | None = None
+
+    @classmethod
+    def from_query(cls, query: dict[str, list[str]]):
+        def flag(name: str) -> bool:
+            return query.get(name, ["0"])[-1].lower() in ("1", "true", "yes", "on")
+
+        seed = query.get("seed", [None])[-1]
+        return cls(flag("partial"), flag("minify"), seed)
+
+
+class ResponseCache:
+    """
+    A thread safe LRU cache of rendered responses holding at most max_bytes of response bodies
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: collections.OrderedDict[typing.Hashable, bytes] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: typing.Hashable) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: typing.Hashable, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self.size -= len(old)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class RenderServer:
+    """
+    WSGI application that renders CSV to HTML tables. The specializers, the page templates and the
+    HTML attribute tables are loaded once and shared by every request. Everything that belongs to a
+    single render lives in the RenderContext that TableHTMLMaker creates for it, so concurrent requests
+    do not see each other's state.
+
+    POST /render with the CSV as the request body, or
+    GET /render?path=FILE with FILE relative to root.
+    The query parameters partial, minify and seed work like the command line options of the same names.
+    Responses are cached by the hash of the CSV, the options and the date
+    """
+
+    def __init__(
+        self,
+        specializers: list[Specializer],
+        root: str = ".",
+        cache_size: int = 64 * 1024 * 1024,
+        template_filename: str = "support/template.html",
+        stylesheet_filename: str = "support/style.css",
+    ):
+        self.specializers = specializers
+        self.root = os.path.realpath(root)
+        self.templates = {
+            minify: HTMLTemplate.from_files(
+                template_filename, stylesheet_filename, minify
+            )
+            for minify in (False, True)
+        }
+        self.cache = ResponseCache(cache_size)
+        # load the attribute tables now rather than during the first request
+        tag.valid_attributes()
+
+    def __call__(self, environ, start_response) -> typing.Iterable[bytes]:
+        try:
+            if environ.get("PATH_INFO", "/") != "/render":
+                raise HTTPError("404 Not Found", "No such endpoint")
+
+            query = urllib.parse.parse_qs(environ.get("QUERY_STRING", ""))
+            options = RenderOptions.from_query(query)
+            method = environ["REQUEST_METHOD"]
+            if method == "POST":
+                data = self._read_body(environ)
+            elif method == "GET":
+                data = self._read_path(query)
+            else:
+                raise HTTPError("405 Method Not Allowed", "Use GET or POST")
+
+            # @pydate renders the date of the render
+            key = (
+                hashlib.sha256(data).hexdigest(),
+                options,
+                datetime.date.today().isoformat(),
+            )
+            if (body := self.cache.get(key)) is not None:
+                start_response(
+                    "200 OK",
+                    self._headers(
+                        ("Content-Length", str(len(body))), ("X-Cache", "hit")
+                    ),
+                )
+                return [body]
+
+            table = self._parse(data)
+        except HTTPError as e:
+            start_response(e.status, [("Content-Type", "text/plain; charset=utf-8")])
+            return [e.message.encode("utf-8")]
+
+        start_response("200 OK", self._headers(("X-Cache", "miss")))
+        return self._stream(key, table, options)
+
+    def render(self, table: Table, options: RenderOptions) -> typing.Iterator[str]:
+        template = self.templates[options.minify]
+        maker = TableHTMLMaker(
+            table, self.specializers, seed=options.seed, minify=options.minify
+        )
+        if options.partial:
+            return template.iter_partial(maker.iter_html())
+        return template.iter_document(maker.iter_html())
+
+    def _stream(
+        self, key: typing.Hashable, table: Table, options: RenderOptions
+    ) -> typing.Iterator[bytes]:
+        chunks: list[bytes] | None = []
+        size = 0
+        pending: list[str] = []
+        pending_size = 0
+
+        for piece in self.render(table, options):
+            pending.append(piece)
+            pending_size += len(piece)
+            if pending_size < CHUNK_SIZE:
+                continue
+
+            chunk = "".join(pending).encode("utf-8")
+            pending.clear()
+            pending_size = 0
+            if chunks is not None:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.cache.max_bytes:
+                    chunks = None  # too big to cache, stop keeping a copy
+            yield chunk
+
+        chunk = "".join(pending).encode("utf-8")
+        if chunks is not None:
+            chunks.append(chunk)
+            self.cache.put(key, b"".join(chunks))
+        yield chunk
+
+    def _read_body(self, environ) -> bytes:
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            raise HTTPError("400 Bad Request", "Invalid Content-Length") from None
+        return environ["wsgi.input"].read(length)
+
+    def _read_path(self, query: dict[str, list[str]]) -> bytes:
+        if "path" not in query:
+            raise HTTPError("400 Bad Request", "Missing path parameter")
+
+        filename = os.path.realpath(os.path.join(self.root, query["path"][-1]))
+        if os.path.commonpath([self.root, filename]) != self.root:
+            raise HTTPError("403 Forbidden", "path is outside of the server root")
+
+        try:
+            with open(filename, "rb") as f:
+                return f.read()
+        except OSError:
+            raise HTTPError("404 Not Found", "No such file") from None
+
+    def _parse(self, data: bytes) -> Table:
+        try:
+            text = data.decode("utf-8")
+            return Table.from_csv_reader(csv.reader(io.StringIO(text, newline="")))
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            raise HTTPError("400 Bad Request", f"Invalid CSV: {e}") from None
+        except StopIteration:
+            raise HTTPError("400 Bad Request", "Invalid CSV: no header row") from None
+
+    @staticmethod
+    def _headers(*extra: tuple[str, str]) -> list[tuple[str, str]]:
+        return [("Content-Type", "text/html; charset=utf-8"), *extra]
+
+
+class ThreadingWSGIServer(
+    socketserver.ThreadingMixIn, wsgiref.simple_server.WSGIServer
+):
+    daemon_threads = True
+
+
+def serve(app: RenderServer, host: str = "127.0.0.1", port: int = 8000):
+    with wsgiref.simple_server.make_server(
+        host, port, app, server_class=ThreadingWSGIServer
+    ) as httpd:
+        print(f"Serving on http://{host}:{httpd.server_port}/render")
+        httpd.serve_forever()
@@ -1,11 +1,35 @@
+import contextlib
 import csv
+import gc
+import io
+import itertools
+import operator
+import os
 import typing
+import parallelcsv
+from progress import Budgeted, ProgressHook, ProgressTracker
+import tablecache
 from tablerow import TableRow, quote_wrap, TableColumn
 import collections
 
 Headers: typing.TypeAlias = collections.OrderedDict[str, TableColumn]
 
 
+@contextlib.contextmanager
+def _gc_paused():
+    """
+    Loading millions of rows allocates millions of lists, none of them garbage, which makes the
+    cyclic garbage collector run over and over for nothing. Pause it for the duration of a bulk load
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 class Table:
     def __init__(self, headers: Headers):
         self.headers: Headers = collections.OrderedDict()
@@ -13,79 +37,225 @@ class Table:
             self.headers[key] = col
 
         self.rows: list[TableRow] = []
+        # True if loading stopped at a deadline before every row of the input was read
+        self.truncated = False
 
     def __len__(self):
         return len(self.rows)
 
     def __str__(self):
-        longest_len = 0
-        for row in self.rows:
-            for entry in row:
-                if len(entry) > longest_len:
-                    longest_len = len(entry)
+        buffer = io.StringIO()
+        self.write_pretty(buffer)
+        return buffer.getvalue()
 
-        if longest_len > 40:
-            longest_len = 0
+    def write_csv(
+        self, f: typing.TextIO, dialect: str | csv.Dialect = "excel", **fmtparams
+    ):
+        """
+        Writes the headers and then each row to f as CSV, one row at a time.
+        f should be opened with newline="" as the csv module requires
+        """
+        writer = csv.writer(f, dialect, **fmtparams)
+        writer.writerow(self.headers)
+        writer.writerows(row.content for row in self.rows)
 
-        content = [",".join(quote_wrap(i).rjust(longest_len) for i in self.headers)]
+    def write_pretty(self, f: typing.TextIO, max_width: int = 40):
+        """
+        Writes the table as comma separated text with every column right aligned to its widest value.
+        Columns with values longer than max_width are not padded. The first pass over the rows only
+        measures the columns so nothing but the widths is held in memory
+        """
+        widths = [len(quote_wrap(i)) for i in self.headers]
         for row in self.rows:
-            row_str = ""
-            for entry in row:
-                row_str = ",".join(quote_wrap(i).rjust(longest_len) for i in row)
-            content.append(row_str)
+            for index, entry in enumerate(row.content):
+                length = len(quote_wrap(entry))
+                if index >= len(widths):
+                    widths.append(length)
+                elif length > widths[index]:
+                    widths[index] = length
 
-        return "\n".join(content)
+        widths = [0 if width > max_width else width for width in widths]
+
+        def line(values) -> str:
+            return ",".join(
+                quote_wrap(value).rjust(width) for value, width in zip(values, widths)
+            )
+
+        f.write(line(self.headers))
+        for row in self.rows:
+            f.write("\n")
+            f.write(line(row.content))
 
     def save_filename(self, filename):
-        with open(filename, "w") as g:
+        with open(filename, "w", newline="") as g:
             self.save_file(g)
 
     def save_file(self, f):
-        f.write(str(self))
+        self.write_csv(f)
 
     @classmethod
-    def from_filename(cls, filename):
-        with open(filename) as f:
-            data = csv.reader(f)
-            return cls.from_csv_reader(data)
+    def from_filename(
+        cls,
+        filename,
+        cache: bool = False,
+        workers: int | None = None,
+        progress: ProgressHook | None = None,
+        encoding: str = "utf-8",
+        deadline: float | None = None,
+    ):
+        """
+        Parse the CSV file filename, decoded with encoding. If cache is True, the parsed table is loaded from a
+        binary cache stored next to filename when one exists for the current contents of the file.
+        Otherwise the file is parsed and the cache is (re)written, unless parsing stopped at the deadline.
+        If workers is more than 1, the file is parsed in that many processes, see parallelcsv.RowReader.
+        progress and deadline are passed on to from_csv_reader
+        """
+        if cache:
+            source = tablecache.fingerprint(filename, encoding)
+            # one pause for loading and building the rows, so the collector
+            # only looks at the new objects once
+            with _gc_paused():
+                if (cached := tablecache.load(filename, source)) is not None:
+                    tracker = ProgressTracker(progress, "load") if progress else None
+                    table = cls.from_rows(*cached)
+            if cached is not None:
+                if tracker is not None:
+                    tracker.finish(len(table))
+                return table
+
+        size = os.path.getsize(filename)
+        if workers is not None and workers > 1:
+            reader = parallelcsv.RowReader(filename, workers, encoding)
+
+            def fraction() -> float:
+                return reader.tell() / size if size else 1.0
+
+            table = cls.from_csv_reader(
+                reader, progress=progress, fraction=fraction, deadline=deadline
+            )
+        else:
+            with open(filename, newline="", encoding=encoding) as f:
+                data = csv.reader(f)
+
+                def fraction() -> float:
+                    # the bytes read so far, give or take the text that is read ahead
+                    return f.buffer.tell() / size if size else 1.0
+
+                table = cls.from_csv_reader(
+                    data, progress=progress, fraction=fraction, deadline=deadline
+                )
+
+        if cache and not table.truncated:
+            with _gc_paused():
+                tablecache.store(
+                    filename,
+                    list(table.headers),
+                    (row.content for row in table.rows),
+                    source,
+                )
+
+        return table
+
+    @classmethod
+    def from_rows(cls, headers: list[str], rows: list[list[str]]):
+        """
+        Build a table from the header names and a list of rows. The row lists become the
+        content of the table's rows as they are, without being checked or copied
+        """
+        ret_val = cls(
+            collections.OrderedDict((i, TableColumn.named(i)) for i in headers)
+        )
+        with _gc_paused():
+            ret_val.rows = list(map(TableRow, rows, itertools.repeat(ret_val)))
+        return ret_val
+
+    @classmethod
+    def from_columns(
+        cls, headers: list[str], columns: typing.Sequence[typing.Sequence[str]]
+    ):
+        """
+        Build a table from the header names and one sequence of values per column
+        """
+        ret_val = cls(
+            collections.OrderedDict((i, TableColumn.named(i)) for i in headers)
+        )
+        with _gc_paused():
+            ret_val.rows = [TableRow(list(row), ret_val) for row in zip(*columns)]
+        return ret_val
+
+    def columns(self) -> list[list[str]]:
+        """
+        The values of the table column by column rather than row by row. There is one column per value
+        in a row, which is not always the number of headers because rows are only checked against each other
+        """
+        contents = [row.content for row in self.rows]
+        width = len(contents[0]) if contents else len(self.headers)
+        return [list(map(operator.itemgetter(i), contents)) for i in range(width)]
 
     @classmethod
     def from_csv_reader(
-        cls, reader, with_headers=True, missing_value: str | None = None
+        cls,
+        reader,
+        with_headers=True,
+        missing_value: str | None = None,
+        progress: ProgressHook | None = None,
+        fraction: typing.Callable[[], float] | None = None,
+        deadline: float | None = None,
     ):
+        """
+        Build a table from the rows of a csv.reader or anything like it.
+        progress is called with the Progress of the load every now and then and once at the end.
+        If fraction is given, it is called for the part of the input that has been read to estimate
+        how long the load has left.
+        If deadline, a time.monotonic() value, passes before every row is read, the rest are left
+        unread and the table is marked truncated
+        """
+        reader = iter(reader)
         if with_headers:
-            headers: Headers | None = collections.OrderedDict(
+            headers: Headers = collections.OrderedDict(
                 (i, TableColumn.named(i)) for i in next(reader)
             )
         else:
-            headers = None
+            headers = collections.OrderedDict()
 
         # add all headers - if no headers, deal with that later
-        ret_val = cls(typing.cast(Headers, headers))  # trust me, bro
+        ret_val = cls(headers)
         # add all rows
-        for row in reader:
-            tr = TableRow(row, ret_val)
-            ret_val.add_tablerow(tr)
+        tracker = ProgressTracker(progress, "load") if progress is not None else None
+        if tracker is not None:
+            reader = tracker.track(reader, fraction)
+        budgeted = Budgeted(reader, deadline)
+        with _gc_paused():
+            ret_val.rows = [TableRow(row, ret_val) for row in budgeted]
+        if budgeted.expired:
+            ret_val.truncated = True
+            if tracker is not None:
+                tracker.finish(len(ret_val.rows), truncated=True)
+
+        if not ret_val.rows:
+            return ret_val
 
         # missing check
         rows = iter(ret_val.rows)
         first = next(rows)
+        width = len(first)
 
         # fill in missing cells if requested, otherwise raise an error
         for other in rows:
-            if len(other) != len(first):
+            if len(other) != width:
                 if missing_value is not None:
                     while len(other) < len(first):
                         other.content.append(missing_value)
                     while len(first) < len(other):
                         first.content.append(missing_value)
+                    width = len(first)
                 else:
                     raise ValueError(
                         f"Row value length mismatch {other} has {len(other)} values but expected {len(first)}"
                     )
 
         # if the headers were not provided, we will fill them in generically
-        if ret_val.headers is None:
+        if not with_headers:
             ret_val.headers = collections.OrderedDict(
                 [(str(i), TableColumn(str(i))) for i in range(len(first))]
             )
@@ -0,0 +1,115 @@
+import collections
+import hashlib
+import marshal
+import os
+import struct
+import sys
+import typing
+
+# A cache file is MAGIC, the length of the marshalled metadata, the marshalled metadata
+# (format version, python version and source fingerprint) and then the marshalled payload
+# (the headers and the rows). The payload is only unmarshalled once the metadata shows the
+# cache is still fresh.
+# The rows are stored as they are so loading gives the lists the table uses without any
+# transposing or copying. Equal values in a column are stored as one string object, which
+# marshal writes once and refers back to after that, so repeated values cost a few bytes each
+MAGIC = b"TBLCACHE"
+FORMAT_VERSION = 3
+SUFFIX = ".tblcache"
+
+_length = struct.Struct("<Q")
+
+Fingerprint: typing.TypeAlias = tuple[str, int, int, str, str]
+Rows: typing.TypeAlias = list[list[str]]
+
+
+def cache_filename(filename: str) -> str:
+    """
+    The cache for a source file is stored next to it
+    """
+    return filename + SUFFIX
+
+
+def fingerprint(filename: str, encoding: str = "utf-8") -> Fingerprint:
+    """
+    The absolute path, size, modification time and content hash of filename, and the
+    encoding it is decoded with, which changes the table parsed from the same bytes
+    """
+    stat = os.stat(filename)
+    with open(filename, "rb") as f:
+        digest = hashlib.file_digest(f, "blake2b").hexdigest()
+    return (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns, digest, encoding)
+
+
+def _metadata(source: Fingerprint) -> tuple:
+    # marshal's format is only stable within one python version
+    return (
+        FORMAT_VERSION,
+        sys.version_info[:2],
+        marshal.version,
+        sys.byteorder,
+        source,
+    )
+
+
+def _share_values(rows: typing.Iterable[list[str]]) -> Rows:
+    """
+    Copies of rows in which equal values of a column are the same string object
+    """
+    seen: dict[int, dict[str, str]] = collections.defaultdict(dict)
+    shared = []
+    for row in rows:
+        shared.append([seen[i].setdefault(value, value) for i, value in enumerate(row)])
+    return shared
+
+
+def load(
+    filename: str, source: Fingerprint | None = None
+) -> tuple[list[str], Rows] | None:
+    """
+    Returns the headers and rows cached for filename or None if there is no cache
+    or the cache is stale, meaning it was made from a different version of the file
+    """
+    if source is None:
+        source = fingerprint(filename)
+
+    try:
+        with open(cache_filename(filename), "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = _length.unpack(f.read(_length.size))
+            if marshal.loads(f.read(length)) != _metadata(source):
+                return None
+            headers, rows = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        return None
+
+    return headers, rows
+
+
+def store(
+    filename: str,
+    headers: list[str],
+    rows: typing.Iterable[list[str]],
+    source: Fingerprint | None = None,
+):
+    """
+    Write the cache for filename. The cache is written to a temporary file first and
+    then moved into place so that readers never see a partially written cache
+    """
+    if source is None:
+        source = fingerprint(filename)
+
+    metadata = marshal.dumps(_metadata(source))
+    target = cache_filename(filename)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(_length.pack(len(metadata)))
+            f.write(metadata)
+            marshal.dump((headers, _share_values(rows)), f)
+        os.replace(temporary, target)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
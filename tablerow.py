@@ -1,12 +1,14 @@
 import typing
-from htmlspecializer import ColorSpecializer
+from htmlspecializer import ColorSpecializer, Specializer
 
 
 def quote_wrap(s):
-    if "," in s:
-        if '"' in s:
-            s = s.replace('"', '\\"')
-        return '"{}"'.format(s)
+    """
+    Quote s the way csv.writer does with the default excel dialect: only when it contains a
+    delimiter, a quote or a line break, doubling any quotes inside it
+    """
+    if "," in s or '"' in s or "\n" in s or "\r" in s:
+        return '"{}"'.format(s.replace('"', '""'))
     return s
 
 
@@ -15,12 +17,42 @@ def color_column_transform(arg):
 
 
 class TableColumn:
+    """
+    A named column of a Table. A column can be bound to the Specializer that all of its cells use, or to
+    plain text if none of its cells use one, so that TableHTMLMaker does not have to try every specializer
+    on every cell. A binding is only a hint: cells that do not fit it are rendered the usual way, and a
+    maker that does not have the bound specializer renders the column as if it was not bound
+    """
+
     @classmethod
     def named(cls, name: str):
         return cls(name)
 
-    def __init__(self, name: str):
+    def __init__(
+        self,
+        name: str,
+        specializer: Specializer | None = None,
+        plain_text: bool = False,
+    ):
         self.name = name
+        self.specializer = specializer
+        self.plain_text = plain_text and specializer is None
+
+    @property
+    def bound(self) -> bool:
+        return self.specializer is not None or self.plain_text
+
+    def bind(self, specializer: Specializer):
+        self.specializer = specializer
+        self.plain_text = False
+
+    def bind_plain_text(self):
+        self.specializer = None
+        self.plain_text = True
+
+    def unbind(self):
+        self.specializer = None
+        self.plain_text = False
 
     def matches(self, column_name: str) -> bool:
         return self.name == column_name
@@ -33,6 +65,8 @@ class TableColumn:
 
 
 class TableRow:
+    __slots__ = ("content", "owner")
+
     def __init__(self, data: list[str], owner: "Table"):
         # self.headers = list(data.keys())
         self.content = data
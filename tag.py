@@ -1,24 +1,159 @@
 from os import replace
+import os
 import spllib
+import threading
 import weakref
 import enum
 from pytomutil.dicts import ReplaceMode, key_merge, key_migrate
 import typing
+import html
+import re
 
-with open("support/valid-tags.spl") as g:
-    valids = spllib.load(g)
+VALID_TAGS_FILENAME = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "support", "valid-tags.spl"
+)
+
+_valids: dict[str, list[str]] | None = None
+_valids_lock = threading.Lock()
+
+
+def valid_attributes() -> dict[str, list[str]]:
+    """
+    The tags that each HTML attribute is valid on, loaded the first time it is needed.
+    Threads that need it at the same time wait for a single load instead of each loading it
+    """
+    global _valids
+    if _valids is None:
+        with _valids_lock:
+            if _valids is None:
+                with open(VALID_TAGS_FILENAME) as g:
+                    _valids = spllib.load(g)
+    return _valids
 
 
 def check_valid_attr(attr: str, tag: str):
     attr = attr.lower()
     if attr.startswith("data-"):
         return  # valid on all tags no matter what comes after
+    valids = valid_attributes()
     if attr not in valids:
         raise ValueError(f"No such HTML attribute {attr!r}")
     if valids[attr][0] != "*" and tag.lower() not in valids[attr]:
         raise ValueError(f"The attribute {attr!r} is not valid for the tag <{tag}>")
 
 
+def escape_text(text: str) -> str:
+    """
+    The same as html.escape(text) but returns text unchanged without any copying when
+    there is nothing to escape, which is the case for most table cells
+    """
+    if "&" in text or "<" in text or ">" in text or '"' in text or "'" in text:
+        return html.escape(text)
+    return text
+
+
+def escape_attr(value: str) -> str:
+    """
+    Escape value for use inside of a double quoted attribute
+    """
+    if "&" in value or '"' in value:
+        return value.replace("&", "&amp;").replace('"', "&quot;")
+    return value
+
+
+_js_token = re.compile(
+    r"""//[^\n]*|/\*.*?\*/|'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`""",
+    re.DOTALL,
+)
+
+
+def _literal_line_breaks(script: str) -> set[int] | None:
+    """
+    The positions of the line breaks in script that are part of a template literal or of a string continued
+    with a backslash, or None if script has a backtick that does not belong to a whole template literal
+    """
+    protected: set[int] = set()
+    outside = []
+    position = 0
+    for match in _js_token.finditer(script):
+        outside.append(script[position : match.start()])
+        position = match.end()
+        token = match.group()
+        if token[0] in "`'\"" and "\n" in token:
+            start = match.start()
+            protected.update(start + i for i, c in enumerate(token) if c == "\n")
+    outside.append(script[position:])
+    if any("`" in part for part in outside):
+        return None
+    return protected
+
+
+def compact_script(script: str) -> str:
+    """
+    Removes indentation, trailing whitespace and blank lines from a script. Line breaks are kept
+    because scripts may rely on automatic semicolon insertion. Lines that continue a template literal
+    or a string are left as they are, and so is a script that can not be followed
+    """
+    if "`" not in script and "\\\n" not in script:
+        return "\n".join(line for line in map(str.strip, script.splitlines()) if line)
+
+    if (protected := _literal_line_breaks(script)) is None:
+        return script
+
+    lines: list[str] = []
+    position = 0
+    continued = False  # whether this line continues a literal from the line before
+    for line in script.split("\n"):
+        end = position + len(line)
+        continues = end in protected
+        text = line if continued else line.lstrip()
+        if not continues:
+            text = text.rstrip()
+        if continued:
+            lines[-1] += "\n" + text
+        elif text or continues:
+            lines.append(text)
+        continued = continues
+        position = end + 1
+    return "\n".join(lines)
+
+
+_css_comment_or_string = re.compile(
+    r"""/\*.*?\*/|("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""", re.DOTALL
+)
+_css_string = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""", re.DOTALL)
+_css_space = re.compile(r"\s+")
+_css_punctuation = re.compile(r"\s*([{};,>])\s*")
+
+
+def _compact_css_code(code: str) -> str:
+    code = _css_space.sub(" ", code)
+    code = _css_punctuation.sub(r"\1", code)
+    return code.replace(": ", ":").replace(";}", "}")
+
+
+def compact_css(stylesheet: str) -> str:
+    """
+    Removes comments and all whitespace that does not separate two tokens from a stylesheet.
+    Quoted strings are left as they are
+    """
+    # comments go first, keeping strings so that a comment marker in a string is not taken for one
+    stylesheet = _css_comment_or_string.sub(
+        lambda match: match.group(1) or "", stylesheet
+    )
+    # the pieces at odd indexes are the strings
+    pieces = _css_string.split(stylesheet)
+    return "".join(
+        piece if i % 2 else _compact_css_code(piece) for i, piece in enumerate(pieces)
+    ).strip()
+
+
+_compactors: dict[str, typing.Callable[[str], str]] = {
+    "script": compact_script,
+    "style": compact_css,
+}
+
+
 def _find_by_id(id: str, root: "Tag") -> "Tag | None":
     if root.attributes.get("id", None) == id:
         return root
@@ -176,7 +311,8 @@ class Tag:
 
     def open_tag(self) -> str:
         attrs = " ".join(
-            '{}="{}"'.format(k.lower(), v) for (k, v) in self.attributes.items()
+            '{}="{}"'.format(k.lower(), escape_attr(str(v)))
+            for (k, v) in self.attributes.items()
         ).strip()
         if_self_closing = "/" if self.self_closing else ""
         name = self.name.lower()
@@ -187,8 +323,17 @@ class Tag:
     def close_tag(self) -> str:
         return "</{}>".format(self.name) if not self.self_closing else ""
 
-    def html(self) -> str:
-        children = "\n".join(i.html() for i in self.children)
+    def html(self, minify: bool = False) -> str:
+        """
+        Serialize the tag and its children. If minify is True, the whitespace between elements is left out
+        and the contents of <script> and <style> elements are compacted
+        """
+        if not minify:
+            children = "\n".join(i.html() for i in self.children)
+        else:
+            children = "".join(i.html(minify) for i in self.children)
+            if (compact := _compactors.get(self.name.lower())) is not None:
+                children = compact(children)
         return f"{self.open_tag()}{children}{self.close_tag()}"
 
 
@@ -203,7 +348,7 @@ class TextNode(Tag):
     def dom(self) -> Tag:
         return self
 
-    def html(self) -> str:
+    def html(self, minify: bool = False) -> str:
         return self.data
 
 
@@ -211,5 +356,5 @@ class TagGroup(Tag):
     def __init__(self, *tags: Tag):
         super().__init__("Invisible", children=list(tags), self_closing=True)
 
-    def html(self) -> str:
-        return "\n".join(i.html() for i in self.children)
+    def html(self, minify: bool = False) -> str:
+        return ("" if minify else "\n").join(i.html(minify) for i in self.children)
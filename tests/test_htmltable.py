@@ -0,0 +1,229 @@
+import unittest
+import concurrent.futures
+import gzip
+import io
+import collections
+import html
+
+from compressors import get_compressor
+from htmlspecializer import ColorSpecializer, Specializer
+from htmltable import TableHTMLMaker
+from table import Table
+from tablerow import TableColumn
+from tag import TextNode, escape_text
+
+
+class TestStreamingRender(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(
+            collections.OrderedDict((h, TableColumn.named(h)) for h in ("a", "b"))
+        )
+        self.table.add_row_ordered("1", "<b>")
+        self.table.add_row_ordered("2", "Bob, Charlie")
+        self.table.add_row_ordered("3", "@img:https://example.com/x.png$$10x20")
+
+    def test_iter_html_matches_render(self):
+        maker = TableHTMLMaker(self.table)
+        self.assertEqual("".join(maker.iter_html()), maker.render().html())
+
+    def test_iter_html_empty_table(self):
+        maker = TableHTMLMaker(Table(self.table.headers))
+        self.assertEqual("".join(maker.iter_html()), maker.render().html())
+
+    def test_write_gzip(self):
+        maker = TableHTMLMaker(self.table)
+        compressor = get_compressor("gzip", 6)
+        raw = io.BytesIO()
+        stream = compressor.open(raw)
+        text = io.TextIOWrapper(stream, encoding="utf-8")
+        maker.write(text)
+        text.flush()
+        text.detach()
+        compressor.finish(stream)
+
+        self.assertFalse(raw.closed)
+        self.assertEqual(
+            gzip.decompress(raw.getvalue()).decode("utf-8"), maker.render().html()
+        )
+
+
+class TestDeterministicIds(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(
+            collections.OrderedDict((h, TableColumn.named(h)) for h in ("a", "b"))
+        )
+        self.table.add_row_ordered("@color:#ff0", "@rand")
+        self.table.add_row_ordered("@jsdate", "@select:o1=one;o2=two")
+
+    def test_same_input_same_output(self):
+        first = TableHTMLMaker(self.table).render().html()
+        self.assertEqual(first, TableHTMLMaker(self.table).render().html())
+        self.assertIn('id="tbldis-gen-0-0"', first)
+
+    def test_seeded_ids(self):
+        first = "".join(TableHTMLMaker(self.table, seed=1).iter_html())
+        self.assertEqual(first, "".join(TableHTMLMaker(self.table, seed=1).iter_html()))
+        self.assertNotEqual(
+            first, "".join(TableHTMLMaker(self.table, seed=2).iter_html())
+        )
+        self.assertNotIn('id="tbldis-gen-0-0"', first)
+
+
+class TestEscaping(unittest.TestCase):
+    def test_escape_text(self):
+        for text in ("plain", "a & b", "<b>", "\"'"):
+            self.assertEqual(escape_text(text), html.escape(text))
+
+    def test_attribute_values_are_escaped(self):
+        table = Table(collections.OrderedDict([("<h>", TableColumn.named("<h>"))]))
+        table.add_row_ordered('@img:https://example.com/?a=1&b="2"')
+        table.add_row_ordered('@select:a"b=x<y')
+
+        result = TableHTMLMaker(table).render().html()
+        self.assertIn('<th class="tbldis-gen">&lt;h&gt;</th>', result)
+        self.assertIn('src="https://example.com/?a=1&amp;b=&quot;2&quot;"', result)
+        self.assertIn('<option value="a&quot;b">x&lt;y</option>', result)
+
+
+class TestOldStyleSpecializer(unittest.TestCase):
+    class ShoutSpecializer(Specializer):
+        # written against the raw_parse(data) contract, without a render context
+        def __init__(self):
+            super().__init__("shout")
+
+        def raw_parse(self, data):
+            return TextNode(data.upper())
+
+    def test_render(self):
+        table = Table(collections.OrderedDict(a=TableColumn.named("a")))
+        table.add_row_ordered("@shout:hi")
+        table.add_row_ordered("@rand")
+        maker = TableHTMLMaker(table)
+        maker.add_speciailization(self.ShoutSpecializer())
+        html = "".join(maker.iter_html())
+        self.assertIn(">HI</td>", html)
+        self.assertIn('id="tbldis-gen-1-0"', html)
+        self.assertEqual(html, maker.render().html())
+
+
+class TestColumnBindings(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(
+            collections.OrderedDict(
+                (h, TableColumn.named(h)) for h in ("name", "color", "mixed")
+            )
+        )
+        self.table.add_row_ordered("Alice", "@color:red", "@color:blue")
+        self.table.add_row_ordered("<b>", "@color:green", "plain")
+        self.table.add_row_ordered("Bob", "", "@rand")
+
+    def test_detect_bindings(self):
+        maker = TableHTMLMaker(self.table, seed=1)
+        before = "".join(maker.iter_html())
+        maker.detect_bindings()
+        self.assertEqual(
+            maker.bindings, {"name": None, "color": maker.get_specializer("@color:")}
+        )
+        self.assertFalse(any(column.bound for column in self.table.headers.values()))
+        self.assertEqual("".join(maker.iter_html()), before)
+
+    def test_explicit_binding_kept(self):
+        maker = TableHTMLMaker(self.table)
+        self.table.headers["mixed"].bind_plain_text()
+        maker.detect_bindings()
+        self.assertNotIn("mixed", maker.bindings)
+        self.assertTrue(self.table.headers["mixed"].plain_text)
+
+    def test_bindings_stay_with_their_maker(self):
+        TableHTMLMaker(self.table).detect_bindings()
+        html = TableHTMLMaker(self.table, specializers=[]).render().html()
+        self.assertIn("@color:red", html)
+        self.assertNotIn("tbldis-gen-color-component", html)
+
+    def test_foreign_explicit_binding_is_ignored(self):
+        self.table.headers["color"].bind(ColorSpecializer())
+        html = TableHTMLMaker(self.table, specializers=[]).render().html()
+        self.assertNotIn("tbldis-gen-color-component", html)
+
+    def test_cells_outside_the_sample_fall_back(self):
+        maker = TableHTMLMaker(self.table, seed=1)
+        maker.detect_bindings(sample=1)
+        self.assertEqual(len(maker.bindings), 3)
+        self.table.add_row_ordered("@img:x.png", "not a color", "")
+        html = "".join(maker.iter_html())
+        self.assertEqual(html, "".join(TableHTMLMaker(self.table, seed=1).iter_html()))
+        self.assertIn("<img", html)
+
+    def test_custom_matches_outside_the_sample(self):
+        class UpperSpecializer(Specializer):
+            # matches on the content itself rather than on a prefix
+            def __init__(self):
+                super().__init__("upper")
+
+            def matches(self, content):
+                return content.isupper()
+
+            def parse(self, content):
+                return TextNode(content.lower())
+
+            def raw_parse(self, data):
+                return TextNode(data.lower())
+
+        table = Table(collections.OrderedDict(a=TableColumn.named("a")))
+        table.add_row_ordered("one")
+        table.add_row_ordered("two")
+        maker = TableHTMLMaker(table)
+        maker.add_speciailization(UpperSpecializer())
+        maker.detect_bindings(sample=2)
+        table.add_row_ordered("ABC")
+        html = "".join(maker.iter_html())
+        self.assertIn(">abc</td>", html)
+        unbound = TableHTMLMaker(table)
+        unbound.add_speciailization(UpperSpecializer())
+        self.assertEqual(html, unbound.render().html())
+
+
+class TestThreadedRender(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(
+            collections.OrderedDict(
+                (h, TableColumn.named(h)) for h in ("id", "cell", "color")
+            )
+        )
+        cells = ["@rand", "@jsdate", "@select:a;b=B$$x.js", "<i>text</i>", ""]
+        for i in range(2000):
+            self.table.add_row_ordered(str(i), cells[i % len(cells)], "@color:#abc")
+
+    def test_threaded_matches_sequential(self):
+        for seed in (None, 7):
+            for minify in (False, True):
+                maker = TableHTMLMaker(self.table, seed=seed, minify=minify)
+                expected = "".join(maker.iter_html())
+                self.assertEqual("".join(maker.iter_html(threads=8)), expected)
+                self.assertEqual(maker.render(threads=8).html(minify), expected)
+
+    def test_concurrent_renders(self):
+        maker = TableHTMLMaker(self.table, seed=3)
+        expected = "".join(maker.iter_html())
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            results = list(
+                pool.map(lambda _: "".join(maker.iter_html(threads=4)), range(16))
+            )
+        for result in results:
+            self.assertEqual(result, expected)
+
+    def test_threaded_empty_table(self):
+        maker = TableHTMLMaker(Table(self.table.headers))
+        self.assertEqual(
+            "".join(maker.iter_html(threads=4)), "".join(maker.iter_html())
+        )
+
+    def test_specializers_are_copied(self):
+        specializers = []
+        maker = TableHTMLMaker(self.table, specializers)
+        maker.add_speciailization(*TableHTMLMaker(self.table).specializers)
+        self.assertEqual(specializers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
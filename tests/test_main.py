@@ -0,0 +1,113 @@
+import unittest
+import argparse
+import os
+import tempfile
+from unittest import mock
+
+from htmltemplate import HTMLTemplate
+import main
+
+CSV = 'id,name\n1,Alice\n2,"Bob, Charlie"\n3,@color:red\n'
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.dir.name, "input.csv")
+        self.output = os.path.join(self.dir.name, "output.html")
+        self.cache_dir = os.path.join(self.dir.name, "cache")
+        with open(self.input, "w", newline="") as f:
+            f.write(CSV)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def run_main(self, *options: str) -> bytes:
+        argv = ["main.py", "-i", self.input, "-o", self.output]
+        argv += ["--cache-dir", self.cache_dir, *options]
+        with mock.patch("sys.argv", argv):
+            main.main()
+        with open(self.output, "rb") as f:
+            return f.read()
+
+    def cached_outputs(self) -> list[str]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [name for name in os.listdir(self.cache_dir) if name.endswith(".out")]
+
+    def test_miss_then_hit(self):
+        with mock.patch("main.render", wraps=main.render) as render:
+            first = self.run_main()
+            self.assertEqual(render.call_count, 1)
+            self.assertEqual(len(self.cached_outputs()), 1)
+            second = self.run_main()
+            self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertIn(b"Bob, Charlie", first)
+
+    def test_miss_matches_uncached_render(self):
+        cached = self.run_main("--seed", "x")
+        self.assertEqual(self.run_main("--seed", "x", "--no-cache"), cached)
+
+    def test_no_cache(self):
+        with mock.patch("main.render", wraps=main.render) as render:
+            self.run_main("--no-cache")
+            self.run_main("--no-cache")
+            self.assertEqual(render.call_count, 2)
+        self.assertEqual(self.cached_outputs(), [])
+
+    def test_changed_input_misses(self):
+        first = self.run_main()
+        with open(self.input, "a", newline="") as f:
+            f.write("4,Dave\n")
+        self.assertIn(b"Dave", self.run_main())
+        self.assertNotIn(b"Dave", first)
+        self.assertEqual(len(self.cached_outputs()), 2)
+
+
+class TestRenderKey(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.dir.name, "input.csv")
+        with open(self.input, "w", newline="") as f:
+            f.write(CSV)
+        self.template = HTMLTemplate.from_files()
+        self.specializers = main.make_specializers()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def key(self, to_stdout: bool = False, **options) -> str:
+        args = argparse.Namespace(input=self.input)
+        for name in main.OUTPUT_OPTIONS:
+            setattr(args, name, options.get(name))
+        return main.render_key(args, self.template, self.specializers, to_stdout)
+
+    def test_same_inputs_same_key(self):
+        self.assertEqual(self.key(), self.key())
+
+    def test_output_changes_change_key(self):
+        key = self.key()
+        self.assertNotEqual(self.key(to_stdout=True), key)
+        for name in main.OUTPUT_OPTIONS:
+            self.assertNotEqual(self.key(**{name: "1"}), key, name)
+
+    def test_input_contents_change_key(self):
+        key = self.key()
+        with open(self.input, "a", newline="") as f:
+            f.write("4,Dave\n")
+        self.assertNotEqual(self.key(), key)
+
+    def test_format_version_changes_key(self):
+        key = self.key()
+        with mock.patch("main.RENDER_FORMAT_VERSION", main.RENDER_FORMAT_VERSION + 1):
+            self.assertNotEqual(self.key(), key)
+
+    def test_template_changes_key(self):
+        key = self.key()
+        self.template = HTMLTemplate.from_files(minify=True)
+        self.assertNotEqual(self.key(), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
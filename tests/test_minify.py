@@ -0,0 +1,84 @@
+import unittest
+import collections
+
+from htmltable import TableHTMLMaker
+from table import Table
+from tablerow import TableColumn
+from tag import Tag, TagGroup, TextNode, compact_css, compact_script
+
+
+class TestMinify(unittest.TestCase):
+    def test_compact_script(self):
+        script = """
+        let a = 1
+            if (a) {
+                a += 1
+            }
+
+        """
+        self.assertEqual(compact_script(script), "let a = 1\nif (a) {\na += 1\n}")
+
+    def test_compact_css(self):
+        css = """
+        /* comment */
+        table.x > tbody > tr:nth-child(2n + 1) {
+          padding: 4px 6px;
+          font-family: "Lucida Console", monospace;
+        }
+        """
+        self.assertEqual(
+            compact_css(css),
+            'table.x>tbody>tr:nth-child(2n + 1){padding:4px 6px;font-family:"Lucida Console",monospace}',
+        )
+
+    def test_compact_script_keeps_literals(self):
+        script = "  let s = `line1\n    indented ${x}`;  \n\n  let t = 'a\\\n    b'\n  f()  \n"
+        self.assertEqual(
+            compact_script(script),
+            "let s = `line1\n    indented ${x}`;\nlet t = 'a\\\n    b'\nf()",
+        )
+        unterminated = "  let s = `a\n  b"
+        self.assertEqual(compact_script(unterminated), unterminated)
+
+    def test_compact_css_keeps_strings(self):
+        css = 'td::after { content: "a , b: c /* x */"; } /* don\'t */ a { b: c; }'
+        self.assertEqual(
+            compact_css(css), 'td::after{content:"a , b: c /* x */"}a{b:c}'
+        )
+
+    def test_tag_html_minify(self):
+        div = Tag(
+            "div",
+            children=[Tag("p"), Tag("script", children=[TextNode("\n  a()\n  b()\n")])],
+        )
+        self.assertEqual(
+            div.html(), "<div><p></p>\n<script>\n  a()\n  b()\n</script></div>"
+        )
+        self.assertEqual(
+            div.html(minify=True), "<div><p></p><script>a()\nb()</script></div>"
+        )
+        group = TagGroup(Tag("p"), Tag("p"))
+        self.assertEqual(group.html(minify=True), "<p></p><p></p>")
+
+    def test_minified_table(self):
+        table = Table(
+            collections.OrderedDict((h, TableColumn.named(h)) for h in ("a", "b"))
+        )
+        table.add_row_ordered("@color:#ff0", "plain")
+        table.add_row_ordered("2", "3")
+
+        normal = "".join(TableHTMLMaker(table).iter_html())
+        minified = "".join(TableHTMLMaker(table, minify=True).iter_html())
+        self.assertLess(len(minified), len(normal))
+        self.assertNotIn("<td class", minified)
+        self.assertNotIn(">\n<", minified)
+        self.assertIn(
+            '<table cellspacing="0" cellpadding="0" class="tbldis-gen">', minified
+        )
+        self.assertEqual(
+            minified, TableHTMLMaker(table, minify=True).render().html(minify=True)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
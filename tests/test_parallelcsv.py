@@ -0,0 +1,94 @@
+import unittest
+import csv
+import os
+import random
+import tempfile
+
+import parallelcsv
+from table import Table
+
+
+class TestParallelCSV(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, "input.csv")
+        cells = ["plain", "Bob, Charlie", 'say "hi"', "two\nlines", '"\n"', ""]
+        with open(self.filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "a", "b"])
+            for i in range(500):
+                writer.writerow([str(i), rng.choice(cells), rng.choice(cells)])
+
+        with open(self.filename, newline="") as f:
+            self.expected = list(csv.reader(f))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_boundaries_are_record_boundaries(self):
+        old = parallelcsv.BLOCK_SIZE
+        parallelcsv.BLOCK_SIZE = 7  # make boundaries fall across scan blocks
+        try:
+            for count in (1, 2, 7, 50, 5000):
+                boundaries = parallelcsv.find_record_boundaries(self.filename, count)
+                self.assertEqual(boundaries[0], 0)
+                self.assertEqual(boundaries[-1], os.path.getsize(self.filename))
+                self.assertEqual(boundaries, sorted(set(boundaries)))
+
+                rows = []
+                for start, end in zip(boundaries, boundaries[1:]):
+                    rows.extend(parallelcsv.parse_range(self.filename, start, end))
+                self.assertEqual(rows, self.expected)
+        finally:
+            parallelcsv.BLOCK_SIZE = old
+
+    def test_read_rows(self):
+        self.assertEqual(list(parallelcsv.read_rows(self.filename, 3)), self.expected)
+
+    def test_table_from_filename(self):
+        table = Table.from_filename(self.filename, workers=2)
+        self.assertEqual(list(table.headers), self.expected[0])
+        self.assertEqual([row.content for row in table.rows], self.expected[1:])
+
+    def test_same_encoding_with_and_without_workers(self):
+        for encoding in ("utf-8", "latin-1", "utf-16"):
+            with open(self.filename, "w", newline="", encoding=encoding) as f:
+                f.write("name,city\nZoë,Zürich\nJosé,Málaga\n")
+            serial = Table.from_filename(self.filename, encoding=encoding)
+            parallel = Table.from_filename(self.filename, workers=2, encoding=encoding)
+            self.assertEqual(serial.rows[0].content, ["Zoë", "Zürich"])
+            self.assertEqual(
+                [row.content for row in parallel.rows],
+                [row.content for row in serial.rows],
+            )
+
+    def test_reader_tell(self):
+        reader = parallelcsv.RowReader(self.filename, 3)
+        positions = [reader.tell() for _ in reader]
+        self.assertEqual(positions, sorted(positions))
+        self.assertEqual(reader.tell(), os.path.getsize(self.filename))
+
+    def test_dialect_quotechar(self):
+        with open(self.filename, "w", newline="") as f:
+            writer = csv.writer(f, quotechar="'")
+            writer.writerow(["id", "text"])
+            for i in range(300):
+                writer.writerow([str(i), "it's\nsplit, over lines"])
+        with open(self.filename, newline="") as f:
+            expected = list(csv.reader(f, quotechar="'"))
+
+        class Quoted(csv.excel):
+            quotechar = "'"
+
+        old = parallelcsv.BLOCK_SIZE
+        parallelcsv.BLOCK_SIZE = 64
+        try:
+            rows = list(parallelcsv.read_rows(self.filename, 3, dialect=Quoted()))
+        finally:
+            parallelcsv.BLOCK_SIZE = old
+        self.assertEqual(rows, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
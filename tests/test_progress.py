@@ -0,0 +1,125 @@
+import unittest
+import collections
+import csv
+import io
+import itertools
+import time
+from unittest import mock
+
+from htmltable import TableHTMLMaker
+from progress import Budgeted, Progress, ProgressPrinter, ProgressTracker
+from table import Table
+from tablerow import TableColumn
+
+
+def make_table(count: int) -> Table:
+    table = Table(
+        collections.OrderedDict((h, TableColumn.named(h)) for h in ("id", "color"))
+    )
+    for i in range(count):
+        table.add_row_ordered(str(i), "@color:#abc")
+    return table
+
+
+class TestProgress(unittest.TestCase):
+    def test_rate_and_eta(self):
+        progress = Progress("render", 100, 2.0, 0.25)
+        self.assertEqual(progress.rate, 50.0)
+        self.assertEqual(progress.eta, 6.0)
+        self.assertIsNone(Progress("load", 100, 2.0).eta)
+        self.assertEqual(Progress("load", 100, 2.0, finished=True).eta, 0.0)
+
+    def test_tracker_reports_finish(self):
+        reports = []
+        tracker = ProgressTracker(reports.append, "load", interval=0)
+        self.assertEqual(list(tracker.track(range(5), every=2)), list(range(5)))
+        self.assertEqual([r.rows for r in reports], [2, 4, 5])
+        self.assertTrue(reports[-1].finished)
+        self.assertFalse(reports[-1].truncated)
+
+    def test_printer(self):
+        buffer = io.StringIO()
+        ProgressPrinter(buffer)(Progress("render", 1000, 2.0, 0.5))
+        self.assertEqual(
+            buffer.getvalue(), "render: 1,000 rows, 500 rows/s, 50%, ETA 2s\n"
+        )
+
+    def test_budgeted(self):
+        self.assertEqual(list(Budgeted(range(5), None)), list(range(5)))
+        clock = itertools.count()
+        # the clock is read before the items 2 and 4
+        with mock.patch("time.monotonic", lambda: next(clock)):
+            budgeted = Budgeted(range(10), deadline=1, every=2)
+            self.assertEqual(list(budgeted), [0, 1, 2, 3])
+        self.assertTrue(budgeted.expired)
+
+
+class TestLoadProgress(unittest.TestCase):
+    def test_from_csv_reader(self):
+        reports = []
+        rows = [["a", "b"]] + [[str(i), str(i)] for i in range(3000)]
+        table = Table.from_csv_reader(
+            csv.reader(io.StringIO("\n".join(",".join(r) for r in rows))),
+            progress=reports.append,
+        )
+        self.assertEqual(len(table), 3000)
+        self.assertEqual(reports[-1].stage, "load")
+        self.assertEqual(reports[-1].rows, 3000)
+        self.assertTrue(reports[-1].finished)
+
+    def test_deadline_passed(self):
+        reports = []
+        rows = [["a", "b"]] + [[str(i), str(i)] for i in range(3000)]
+        table = Table.from_csv_reader(
+            iter(rows), progress=reports.append, deadline=time.monotonic()
+        )
+        self.assertTrue(table.truncated)
+        self.assertLess(len(table), 3000)
+        self.assertTrue(reports[-1].truncated)
+        self.assertEqual(reports[-1].rows, len(table))
+
+        html = "".join(TableHTMLMaker(table).iter_html())
+        self.assertIn(
+            "Truncated: ran out of time after {:,} rows<".format(len(table)), html
+        )
+
+    def test_empty_truncated_table_gets_marker(self):
+        table = Table(collections.OrderedDict(a=TableColumn.named("a")))
+        table.truncated = True
+        html = "".join(TableHTMLMaker(table).iter_html())
+        self.assertIn("Truncated: ran out of time after 0 rows", html)
+
+
+class TestRenderDeadline(unittest.TestCase):
+    def test_no_deadline(self):
+        reports = []
+        maker = TableHTMLMaker(make_table(10), progress=reports.append)
+        html = "".join(maker.iter_html(deadline=time.monotonic() + 3600))
+        self.assertEqual(html, maker.render().html())
+        self.assertNotIn("tbldis-gen-truncated", html)
+        self.assertEqual(reports[-1], reports[-1]._replace(rows=10, finished=True))
+
+    def test_deadline_passed(self):
+        for threads in (None, 4):
+            reports = []
+            maker = TableHTMLMaker(make_table(1000), progress=reports.append)
+            html = "".join(maker.iter_html(threads=threads, deadline=time.monotonic()))
+            self.assertTrue(
+                html.endswith(
+                    '<tr class="tbldis-gen-truncated"><td colspan="2">'
+                    "Truncated: ran out of time after 0 of 1,000 rows</td></tr></tbody></table>"
+                )
+            )
+            self.assertNotIn("@color", html)
+            self.assertTrue(reports[-1].truncated)
+            self.assertEqual(reports[-1].rows, 0)
+
+    def test_deadline_during_render(self):
+        maker = TableHTMLMaker(make_table(3000), seed=1)
+        clock = itertools.count()
+        # the clock is read once before each row, so the rows 0 to 4 are rendered
+        with mock.patch("time.monotonic", lambda: next(clock)):
+            html = "".join(maker.iter_html(deadline=5))
+        self.assertEqual(html.count("<tr"), 5 + 2)
+        self.assertIn("after 5 of 3,000 rows", html)
+        self.assertTrue(html.endswith("</tbody></table>"))
@@ -0,0 +1,60 @@
+import unittest
+import random
+
+from query import Condition, Query
+
+HEADERS = ["id", "status", "score"]
+
+
+def make_rows(count: int) -> list[list[str]]:
+    rng = random.Random(0)
+    return [
+        [str(i), rng.choice(["active", "inactive"]), str(rng.randint(0, 50))]
+        for i in range(count)
+    ]
+
+
+class TestQuery(unittest.TestCase):
+    def test_condition_parse(self):
+        condition = Condition.parse(" score >= 10 ")
+        self.assertEqual(
+            (condition.column, condition.op, condition.value), ("score", ">=", "10")
+        )
+        self.assertTrue(condition.matches("10"))
+        self.assertTrue(condition.matches("100"))  # numeric, not textual
+        self.assertFalse(condition.matches("9"))
+        with self.assertRaises(ValueError):
+            Condition.parse("score")
+
+    def test_where(self):
+        rows = make_rows(200)
+        query = Query([Condition.parse("status=active"), Condition.parse("score<25")])
+        expected = [r for r in rows if r[1] == "active" and int(r[2]) < 25]
+        self.assertEqual(list(query.apply(HEADERS, rows)), expected)
+
+    def test_top_k_matches_full_sort(self):
+        rows = make_rows(500)
+        for descending in (False, True):
+            query = Query(sort_by="score", descending=descending, limit=20)
+            expected = sorted(rows, key=lambda r: int(r[2]), reverse=descending)[:20]
+            self.assertEqual(list(query.apply(HEADERS, rows)), expected)
+
+    def test_limit_stops_reading(self):
+        rows = iter(make_rows(1000))
+        result = list(Query(limit=10).apply(HEADERS, rows))
+        self.assertEqual(len(result), 10)
+        self.assertEqual(next(rows)[0], "10")
+
+    def test_apply_csv_keeps_headers(self):
+        reader = [HEADERS] + make_rows(5)
+        result = list(Query(sort_by="id", descending=True).apply_csv(reader))
+        self.assertEqual(result[0], HEADERS)
+        self.assertEqual([r[0] for r in result[1:]], ["4", "3", "2", "1", "0"])
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            list(Query(sort_by="missing").apply(HEADERS, make_rows(5)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os
+import tempfile
+
+from rendercache import RenderCache, make_key
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(self.dir.name, max_bytes=25)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def put(self, key: str, data: bytes):
+        with self.cache.store(key) as f:
+            f.write(data)
+
+    def get(self, key: str) -> bytes | None:
+        f = self.cache.open(key)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def test_make_key(self):
+        self.assertEqual(make_key("a", b"b"), make_key(b"a", "b"))
+        self.assertNotEqual(make_key("ab", "c"), make_key("a", "bc"))
+
+    def test_store_and_open(self):
+        self.assertIsNone(self.get("k"))
+        self.put("k", b"output")
+        self.assertEqual(self.get("k"), b"output")
+
+    def test_failed_store_is_discarded(self):
+        with self.assertRaises(RuntimeError):
+            with self.cache.store("k") as f:
+                f.write(b"partial")
+                raise RuntimeError()
+        self.assertIsNone(self.get("k"))
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_least_recently_used_is_evicted(self):
+        self.put("a", b"a" * 10)
+        self.put("b", b"b" * 10)
+        for key, when in (("a", 1), ("b", 2)):
+            os.utime(os.path.join(self.dir.name, key + ".out"), (when, when))
+
+        self.assertIsNotNone(self.get("a"))  # a is now the most recently used
+        self.put("c", b"c" * 10)
+        self.assertIsNotNone(self.get("a"))
+        self.assertIsNone(self.get("b"))
+        self.assertIsNotNone(self.get("c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import datetime
+import io
+import os
+import tempfile
+import wsgiref.util
+from unittest import mock
+
+from htmlspecializer import Specializer
+import server
+import tag
+from server import RenderServer
+
+CSV = b'id,choice\n1,@select:a;b$$/one.js\n2,@select:c;d\n3,"Bob, Charlie"\n'
+
+
+class TestRenderServer(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.dir.name, "input.csv"), "wb") as f:
+            f.write(CSV)
+        self.app = RenderServer(Specializer.default_speciailizers(), root=self.dir.name)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def request(self, method: str, query: str = "", body: bytes = b""):
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": "/render",
+            "QUERY_STRING": query,
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+        wsgiref.util.setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, headers):
+            response["status"] = status
+            response["headers"] = dict(headers)
+
+        content = b"".join(self.app(environ, start_response))
+        return response["status"], response["headers"], content
+
+    def test_post_and_cache(self):
+        status, headers, first = self.request("POST", "partial=1", CSV)
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["X-Cache"], "miss")
+        self.assertIn(b"<style>", first)
+
+        status, headers, second = self.request("POST", "partial=1", CSV)
+        self.assertEqual(headers["X-Cache"], "hit")
+        self.assertEqual(first, second)
+
+        _, headers, full = self.request("POST", "", CSV)
+        self.assertEqual(headers["X-Cache"], "miss")
+        self.assertTrue(full.startswith(b"<!DOCTYPE html>"))
+
+    def test_cache_expires_with_the_date(self):
+        self.request("POST", "", CSV)
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+        with mock.patch.object(server.datetime, "date") as date:
+            date.today.return_value = tomorrow
+            _, headers, _ = self.request("POST", "", CSV)
+        self.assertEqual(headers["X-Cache"], "miss")
+
+    def test_attribute_tables_loaded_up_front(self):
+        with mock.patch.object(tag, "_valids", None):
+            RenderServer([], root=self.dir.name)
+            self.assertIsNotNone(tag._valids)
+
+    def test_renders_are_isolated(self):
+        _, _, first = self.request("POST", "", CSV)
+        _, _, second = self.request("POST", "seed=1", CSV)
+        self.assertEqual(first.count(b'src="/one.js"'), 1)
+        self.assertEqual(second.count(b'src="/one.js"'), 1)
+
+    def test_path(self):
+        _, _, posted = self.request("POST", "", CSV)
+        status, headers, content = self.request("GET", "path=input.csv")
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["X-Cache"], "hit")
+        self.assertEqual(content, posted)
+
+        status, _, _ = self.request("GET", "path=../input.csv")
+        self.assertEqual(status, "403 Forbidden")
+        status, _, _ = self.request("GET", "path=missing.csv")
+        self.assertEqual(status, "404 Not Found")
+
+    def test_bad_csv(self):
+        status, _, _ = self.request("POST", "", b"a,b\n1,2\n3\n")
+        self.assertEqual(status, "400 Bad Request")
+        status, _, _ = self.request("POST", "", b"")
+        self.assertEqual(status, "400 Bad Request")
+
+
+if __name__ == "__main__":
+    unittest.main()
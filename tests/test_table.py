@@ -0,0 +1,66 @@
+import unittest
+import collections
+import csv
+import io
+
+from table import Table
+from tablerow import TableColumn, quote_wrap
+
+
+class TestTableCSV(unittest.TestCase):
+    def setUp(self):
+        self.table = Table(
+            collections.OrderedDict((h, TableColumn.named(h)) for h in ("id", "name"))
+        )
+        self.table.add_row_ordered("1", "Bob, Charlie")
+        self.table.add_row_ordered("2", 'say "hi"')
+        self.table.add_row_ordered("3", "two\nlines")
+        self.table.add_row_ordered("4", "")
+
+    def round_trip(self, table: Table) -> Table:
+        buffer = io.StringIO(newline="")
+        table.write_csv(buffer)
+        buffer.seek(0)
+        return Table.from_csv_reader(csv.reader(buffer))
+
+    def test_round_trip(self):
+        result = self.round_trip(self.table)
+        self.assertEqual(list(result.headers), list(self.table.headers))
+        self.assertEqual(
+            [r.content for r in result.rows], [r.content for r in self.table.rows]
+        )
+
+    def test_round_trip_empty(self):
+        result = self.round_trip(Table(self.table.headers))
+        self.assertEqual(list(result.headers), ["id", "name"])
+        self.assertEqual(len(result), 0)
+
+    def test_quote_wrap_matches_csv(self):
+        for value in ("plain", "a,b", 'a"b', "a\nb", ""):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow([value, "x"])
+            self.assertEqual(quote_wrap(value) + ",x\r\n", buffer.getvalue())
+
+    def test_pretty_aligns_columns(self):
+        lines = str(self.table).split("\n")
+        self.assertEqual(lines[0], "id,          name")
+        self.assertEqual(lines[1], ' 1,"Bob, Charlie"')
+        self.assertEqual(len(lines), 6)
+
+    def test_without_headers(self):
+        table = Table.from_csv_reader(
+            iter([["a", "b"], ["c", "d"]]), with_headers=False
+        )
+        self.assertEqual(list(table.headers), ["0", "1"])
+        self.assertEqual(len(table), 2)
+
+    def test_missing_value(self):
+        rows = [["a", "b"], ["1", "2"], ["3"]]
+        with self.assertRaises(ValueError):
+            Table.from_csv_reader(iter(rows))
+        table = Table.from_csv_reader(iter(rows), missing_value="")
+        self.assertEqual(table.rows[1].content, ["3", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import tempfile
+
+import tablecache
+from table import Table
+
+
+class TestTableCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.dir.name, "input.csv")
+        self.write('id,name\n1,"Bob, Charlie"\n2,"two\nlines"\n')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, content: str):
+        with open(self.filename, "w", newline="") as f:
+            f.write(content)
+
+    def contents(self, table: Table):
+        return list(table.headers), [row.content for row in table.rows]
+
+    def test_hit_matches_parse(self):
+        parsed = Table.from_filename(self.filename, cache=True)
+        self.assertTrue(os.path.exists(tablecache.cache_filename(self.filename)))
+        self.assertIsNotNone(tablecache.load(self.filename))
+
+        cached = Table.from_filename(self.filename, cache=True)
+        self.assertEqual(self.contents(cached), self.contents(parsed))
+        self.assertEqual(
+            self.contents(cached), self.contents(Table.from_filename(self.filename))
+        )
+
+    def test_stale_cache_is_rebuilt(self):
+        Table.from_filename(self.filename, cache=True)
+        stat = os.stat(self.filename)
+        # same size and modification time, different content
+        self.write('id,name\n3,"Bob, Charlie"\n4,"two\nlines"\n')
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertIsNone(tablecache.load(self.filename))
+        table = Table.from_filename(self.filename, cache=True)
+        self.assertEqual([row.content[0] for row in table.rows], ["3", "4"])
+        self.assertIsNotNone(tablecache.load(self.filename))
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(tablecache.cache_filename(self.filename), "wb") as f:
+            f.write(tablecache.MAGIC + b"\xff")
+        self.assertIsNone(tablecache.load(self.filename))
+        self.assertEqual(len(Table.from_filename(self.filename, cache=True)), 2)
+
+    def test_empty_table(self):
+        self.write("id,name\n")
+        Table.from_filename(self.filename, cache=True)
+        table = Table.from_filename(self.filename, cache=True)
+        self.assertEqual(self.contents(table), (["id", "name"], []))
+
+    def test_rows_wider_and_narrower_than_headers(self):
+        for content in ("a,b\n1,2,3\n4,5,6\n", "a,b,c\n1,2\n"):
+            self.write(content)
+            parsed = Table.from_filename(self.filename)
+            self.assertEqual(
+                self.contents(Table.from_filename(self.filename, cache=True)),
+                self.contents(parsed),
+            )
+            self.assertEqual(
+                self.contents(Table.from_filename(self.filename, cache=True)),
+                self.contents(parsed),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()